@@ -5,7 +5,10 @@ Demonstrates all 6 phases of compilation
 """
 
 import sys
+import os
 import argparse
+import hashlib
+import pickle
 from lexer import Lexer, TokenType
 from parser import Parser
 from semantic_analyzer import SemanticAnalyzer, SemanticError
@@ -14,16 +17,37 @@ from optimizer import Optimizer
 from interpreter import Interpreter
 
 
+# Compiled programs are cached here, keyed by source and compiler version
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.numcalc_cache')
+
+# Modules that shape the cached code - editing any of them invalidates the
+# cache. The optimizer evaluates constant calls through the interpreter (and
+# its JIT), so those results end up in the cached code as well
+COMPILER_MODULES = ['lexer.py', 'parser.py', 'semantic_analyzer.py', 'ir_generator.py',
+                    'optimizer.py', 'interpreter.py', 'jit.py']
+
+
 class NumCalcCompiler:
     """Main compiler class that orchestrates all phases"""
     
-    def __init__(self, verbose=False, optimize=True):
+    def __init__(self, verbose=False, optimize=True, cache=True):
         self.verbose = verbose
         self.optimize = optimize
+        self.cache = cache
+        self._compiler_digest = None
     
     def compile_and_run(self, source_code: str, filename="<input>"):
         """Compile and execute source code"""
         try:
+            # Unchanged programs skip straight to execution (verbose runs
+            # always show every phase)
+            cache_path = None
+            if self.cache and not self.verbose:
+                cache_path = self.cache_path(source_code)
+                code = self.load_cached(cache_path)
+                if code is not None:
+                    return self.execute(code)
+            
             # Phase 1: Lexical Analysis
             if self.verbose:
                 print("=" * 60)
@@ -96,7 +120,7 @@ class NumCalcCompiler:
                     print("PHASE 5: OPTIMIZATION")
                     print("=" * 60)
                 
-                optimizer = Optimizer(code)
+                optimizer = Optimizer(code, ir_gen.temps)
                 code = optimizer.optimize()
                 
                 if self.verbose:
@@ -109,21 +133,10 @@ class NumCalcCompiler:
                         print(f"  {i:3d}: {instr}")
                     print()
             
-            # Phase 6: Code Generation / Execution
-            if self.verbose:
-                print("=" * 60)
-                print("PHASE 6: CODE EXECUTION")
-                print("=" * 60)
-            
-            interpreter = Interpreter(code)
-            interpreter.execute()
-            
-            if self.verbose:
-                print("\n✓ Execution completed successfully")
-            else:
-                print()  # Newline after output
+            if cache_path is not None:
+                self.store_cached(cache_path, code)
             
-            return True
+            return self.execute(code)
             
         except SyntaxError as e:
             print(f"\n❌ Syntax Error in {filename}:")
@@ -143,6 +156,63 @@ class NumCalcCompiler:
                 traceback.print_exc()
             return False
     
+    def execute(self, code) -> bool:
+        """Phase 6: Code Generation / Execution"""
+        if self.verbose:
+            print("=" * 60)
+            print("PHASE 6: CODE EXECUTION")
+            print("=" * 60)
+        
+        interpreter = Interpreter(code)
+        interpreter.execute()
+        
+        if self.verbose:
+            print("\n✓ Execution completed successfully")
+        else:
+            print()  # Newline after output
+        
+        return True
+    
+    def cache_path(self, source_code: str) -> str:
+        """Get the cache file for a program's compiled code"""
+        if self._compiler_digest is None:
+            digest = hashlib.sha256()
+            here = os.path.dirname(os.path.abspath(__file__))
+            for module in COMPILER_MODULES:
+                try:
+                    with open(os.path.join(here, module), 'rb') as f:
+                        digest.update(f.read())
+                except OSError:
+                    pass
+            self._compiler_digest = digest.hexdigest()
+        
+        key = hashlib.sha256()
+        key.update(self._compiler_digest.encode())
+        key.update(b'opt' if self.optimize else b'noopt')
+        key.update(source_code.encode())
+        return os.path.join(CACHE_DIR, f"{key.hexdigest()}.pkl")
+    
+    @staticmethod
+    def load_cached(path: str):
+        """Load cached code, or None if there is none"""
+        try:
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return None
+    
+    @staticmethod
+    def store_cached(path: str, code):
+        """Cache compiled code (failures only cost the next run a recompile)"""
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, 'wb') as f:
+                pickle.dump(code, f, pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, path)
+        except (OSError, pickle.PicklingError):
+            pass
+    
     def compile_file(self, filename: str):
         """Compile and execute a file"""
         try:
@@ -171,6 +241,7 @@ Examples:
   python compiler.py program.nc              # Compile and run a file
   python compiler.py program.nc -v           # Verbose mode (show all phases)
   python compiler.py program.nc --no-opt     # Disable optimizations
+  python compiler.py program.nc --no-cache   # Always recompile
   python compiler.py -i                      # Interactive mode
 
 About NumCalc:
@@ -184,12 +255,14 @@ About NumCalc:
                        help='Show all compilation phases')
     parser.add_argument('--no-opt', action='store_true',
                        help='Disable optimizations')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Do not reuse or store compiled programs')
     parser.add_argument('-i', '--interactive', action='store_true',
                        help='Interactive mode (REPL)')
     
     args = parser.parse_args()
     
-    compiler = NumCalcCompiler(verbose=args.verbose, optimize=not args.no_opt)
+    compiler = NumCalcCompiler(verbose=args.verbose, optimize=not args.no_opt, cache=not args.no_cache)
     
     # Interactive mode
     if args.interactive:
@@ -7,15 +7,76 @@ import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox, filedialog
 from pathlib import Path
 import sys
-import io
-from contextlib import redirect_stdout, redirect_stderr
+import re
+import bisect
+import hashlib
+import queue
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager, redirect_stdout, redirect_stderr
 
-from lexer import Lexer
-from parser import Parser
-from semantic_analyzer import SemanticAnalyzer
-from ir_generator import IRGenerator
-from optimizer import Optimizer
-from interpreter import Interpreter
+# Delay before refreshing line numbers and highlighting after a keystroke
+REFRESH_DELAY_MS = 50
+
+# Delay after startup before importing the compiler modules
+PREWARM_DELAY_MS = 200
+
+# Interval for polling GUI updates posted by the compile worker
+UI_POLL_MS = 50
+
+# Number of compiled programs kept in the compile cache
+COMPILE_CACHE_SIZE = 8
+
+# Buffered program output is flushed to the output panel in chunks of this size
+OUTPUT_CHUNK_SIZE = 4096
+
+# Syntax highlighting pattern - each named group is the tag applied to its matches.
+# Comments come first so keywords inside a comment are not tagged.
+_HIGHLIGHT_RE = re.compile(r'(?P<comment>//[^\n]*)'
+                           r'|(?P<keyword>\b(?:int|float|bool|string|function|return|if|else|'
+                           r'while|print|true|false)\b)')
+
+
+def newline_offsets(text):
+    """Return the sorted offsets of every newline in text"""
+    offsets = []
+    pos = text.find('\n')
+    while pos != -1:
+        offsets.append(pos)
+        pos = text.find('\n', pos + 1)
+    return offsets
+
+
+def offset_to_index(newlines, first_line, offset):
+    """Convert a text offset to a Tk 'line.col' index using newline offsets"""
+    line = bisect.bisect_left(newlines, offset)
+    col = offset - (newlines[line - 1] + 1 if line else 0)
+    return f"{first_line + line}.{col}"
+
+
+class TkWriter:
+    """File-like object that forwards written text to the GUI in chunks"""
+    
+    def __init__(self, callback, chunk_size=OUTPUT_CHUNK_SIZE):
+        self.callback = callback
+        self.chunk_size = chunk_size
+        self.buffer = []
+        self.buffered = 0
+        self.written = 0
+    
+    def write(self, text):
+        self.buffer.append(text)
+        self.buffered += len(text)
+        self.written += len(text)
+        if self.buffered >= self.chunk_size:
+            self.flush()
+        return len(text)
+    
+    def flush(self):
+        if self.buffer:
+            self.callback(''.join(self.buffer))
+            self.buffer.clear()
+            self.buffered = 0
 
 
 class CompilerGUI:
@@ -24,6 +85,21 @@ class CompilerGUI:
         self.root.title("NumCalc Compiler")
         self.root.geometry("1200x800")
         
+        # Compiled IR keyed by source hash: digest -> {optimize flag: code}
+        self._compile_cache = OrderedDict()
+        
+        # GUI updates posted by the compile worker thread
+        self._ui_queue = queue.Queue()
+        
+        # Read-only text widgets currently enabled by writable()
+        self._writable_widgets = set()
+        
+        # Examples window, hidden rather than destroyed so it can be reused,
+        # and the example file names with the directory mtime they were read at
+        self._examples_window = None
+        self._examples_listbox = None
+        self._examples_cache = None  # (mtime, names)
+        
         # Configure style
         style = ttk.Style()
         style.theme_use('clam')
@@ -56,6 +132,9 @@ class CompilerGUI:
         
         # Load example code
         self.load_example()
+        
+        # Import the compiler once the window is up
+        self.root.after(PREWARM_DELAY_MS, self.prewarm_imports)
     
     def create_toolbar(self, parent):
         """Create toolbar with buttons"""
@@ -67,8 +146,9 @@ class CompilerGUI:
         title.pack(side=tk.LEFT, padx=10)
         
         # Buttons
-        ttk.Button(toolbar, text="▶ Compile & Run", command=self.compile_and_run, 
-                  style="Accent.TButton").pack(side=tk.LEFT, padx=5)
+        self.compile_button = ttk.Button(toolbar, text="▶ Compile & Run", command=self.compile_and_run, 
+                                         style="Accent.TButton")
+        self.compile_button.pack(side=tk.LEFT, padx=5)
         ttk.Button(toolbar, text="📁 Open", command=self.open_file).pack(side=tk.LEFT, padx=5)
         ttk.Button(toolbar, text="💾 Save", command=self.save_file).pack(side=tk.LEFT, padx=5)
         ttk.Button(toolbar, text="🗑 Clear", command=self.clear_editor).pack(side=tk.LEFT, padx=5)
@@ -98,6 +178,8 @@ class CompilerGUI:
         self.line_numbers = tk.Text(editor_container, width=4, padx=5, takefocus=0, border=0,
                                      background='#f0f0f0', state='disabled', wrap='none')
         self.line_numbers.pack(side=tk.LEFT, fill=tk.Y)
+        self._last_line_count = 0
+        self._line_number_strings = []  # str(i + 1) for every number shown so far
         
         # Editor
         self.editor = scrolledtext.ScrolledText(editor_container, wrap=tk.NONE, font=("Consolas", 11),
@@ -110,9 +192,23 @@ class CompilerGUI:
         self.editor.tag_configure("string", foreground="#A31515")
         self.editor.tag_configure("number", foreground="#098658")
         
+        # Cached copy of the editor contents, refreshed when modified
+        self._source_cache = ''
+        self._source_dirty = True
+        
+        # Visible range covered by the last highlighting pass
+        self._highlighted_range = None
+        
+        # Pending debounced refresh job
+        self._refresh_job = None
+        
         # Bind events
-        self.editor.bind('<KeyRelease>', self.update_line_numbers)
-        self.editor.bind('<KeyRelease>', self.apply_syntax_highlighting, add='+')
+        self.editor.bind('<KeyRelease>', self.schedule_refresh)
+        self.editor.bind('<<Modified>>', self.on_source_modified)
+        
+        # Re-highlight when the visible region changes (resize or scroll)
+        self.editor.bind('<Configure>', self.on_view_changed)
+        self.editor.configure(yscrollcommand=self.on_editor_scroll)
     
     def create_output_panel(self, parent):
         """Create output and IR panel"""
@@ -149,185 +245,331 @@ class CompilerGUI:
         self.console = scrolledtext.ScrolledText(console_tab, wrap=tk.WORD, font=("Consolas", 9),
                                                   state='disabled', background='#1e1e1e', foreground='#d4d4d4')
         self.console.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        
+        # Configure tags for different styles
+        self.console.tag_configure("error", foreground="#f48771")
+        self.console.tag_configure("success", foreground="#73c991")
+        self.console.tag_configure("info", foreground="#89d8ff")
     
     def create_status_bar(self, parent):
         """Create status bar"""
         self.status_bar = ttk.Label(parent, text="Ready", relief=tk.SUNKEN, anchor=tk.W)
         self.status_bar.grid(row=2, column=0, sticky=(tk.W, tk.E), pady=(5, 0))
     
+    def on_source_modified(self, event=None):
+        """Invalidate the cached source when the editor contents change"""
+        self._source_dirty = True
+        self.editor.edit_modified(False)
+    
+    def get_source(self):
+        """Get the editor contents, reusing the cached copy when unchanged"""
+        if self._source_dirty:
+            self._source_cache = self.editor.get('1.0', tk.END)
+            self._source_dirty = False
+        return self._source_cache
+    
+    def set_source(self, content):
+        """Replace the editor contents"""
+        self.editor.delete('1.0', tk.END)
+        self.editor.insert('1.0', content)
+        self._source_dirty = True
+    
+    def schedule_refresh(self, event=None):
+        """Debounce editor refreshes so bursts of keys redraw once"""
+        if self._refresh_job:
+            self.root.after_cancel(self._refresh_job)
+        self._refresh_job = self.root.after(REFRESH_DELAY_MS, self._refresh)
+    
+    def _refresh(self):
+        """Update line numbers and highlighting from one source snapshot"""
+        self._refresh_job = None
+        self.update_line_numbers()
+        self.apply_syntax_highlighting()
+    
     def update_line_numbers(self, event=None):
         """Update line numbers"""
-        lines = self.editor.get('1.0', tk.END).count('\n')
-        line_numbers_string = "\n".join(str(i) for i in range(1, lines))
-        
-        self.line_numbers.config(state='normal')
-        self.line_numbers.delete('1.0', tk.END)
-        self.line_numbers.insert('1.0', line_numbers_string)
-        self.line_numbers.config(state='disabled')
+        lines = max(self.get_source().count('\n') - 1, 0)
+        shown = self._last_line_count
+        if lines == shown:
+            return
+        
+        # Only write the numbers that were added or removed
+        with self.writable(self.line_numbers):
+            if lines > shown:
+                numbers = self._line_number_strings
+                if lines > len(numbers):
+                    numbers.extend(map(str, range(len(numbers) + 1, lines + 1)))
+                new_numbers = "\n".join(numbers[shown:lines])
+                if shown:
+                    self.line_numbers.insert(tk.END, "\n" + new_numbers)
+                else:
+                    self.line_numbers.insert('1.0', new_numbers)
+            elif lines:
+                self.line_numbers.delete(f"{lines}.end", tk.END)
+            else:
+                self.line_numbers.delete('1.0', tk.END)
+        self._last_line_count = lines
+    
+    def get_visible_range(self):
+        """Get the (first, last) editor indices of the visible lines"""
+        first = self.editor.index("@0,0 linestart")
+        last = self.editor.index(f"@0,{self.editor.winfo_height()} lineend")
+        return first, last
+    
+    def on_editor_scroll(self, first, last):
+        """Forward scroll updates to the scrollbar and refresh highlighting"""
+        self.editor.vbar.set(first, last)
+        self.on_view_changed()
+    
+    def on_view_changed(self, event=None):
+        """Highlight newly exposed lines after a scroll or resize"""
+        if self.get_visible_range() != self._highlighted_range:
+            self.apply_syntax_highlighting()
     
     def apply_syntax_highlighting(self, event=None):
-        """Simple syntax highlighting"""
+        """Simple syntax highlighting of the visible region"""
+        first, last = self.get_visible_range()
+        self._highlighted_range = (first, last)
+        
         # Clear existing tags
-        self.editor.tag_remove("keyword", "1.0", tk.END)
-        self.editor.tag_remove("comment", "1.0", tk.END)
-        self.editor.tag_remove("string", "1.0", tk.END)
-        self.editor.tag_remove("number", "1.0", tk.END)
-        
-        # Keywords
-        keywords = ['int', 'float', 'bool', 'string', 'function', 'return', 'if', 'else', 
-                   'while', 'print', 'true', 'false']
-        
-        content = self.editor.get('1.0', tk.END)
-        for keyword in keywords:
-            start = '1.0'
-            while True:
-                pos = self.editor.search(f'\\m{keyword}\\M', start, tk.END, regexp=True)
-                if not pos:
-                    break
-                end = f"{pos}+{len(keyword)}c"
-                self.editor.tag_add("keyword", pos, end)
-                start = end
-        
-        # Comments
-        start = '1.0'
-        while True:
-            pos = self.editor.search('//', start, tk.END)
-            if not pos:
-                break
-            end = f"{pos} lineend"
-            self.editor.tag_add("comment", pos, end)
-            start = f"{pos}+1line"
+        self.editor.tag_remove("keyword", first, last)
+        self.editor.tag_remove("comment", first, last)
+        self.editor.tag_remove("string", first, last)
+        self.editor.tag_remove("number", first, last)
+        
+        # Visible part of the cached source
+        text = self.get_source()
+        newlines = newline_offsets(text)
+        first_line = int(first.split('.')[0])
+        last_line = int(last.split('.')[0])
+        start = newlines[first_line - 2] + 1 if first_line > 1 else 0
+        end = newlines[last_line - 1] if last_line <= len(newlines) else len(text)
+        
+        # Keywords and comments in a single scan, one tag_add call per tag
+        ranges = {"keyword": [], "comment": []}
+        for match in _HIGHLIGHT_RE.finditer(text, start, end):
+            tag_ranges = ranges[match.lastgroup]
+            tag_ranges.append(offset_to_index(newlines, 1, match.start()))
+            tag_ranges.append(offset_to_index(newlines, 1, match.end()))
+        
+        for tag, tag_ranges in ranges.items():
+            if tag_ranges:
+                self.editor.tag_add(tag, *tag_ranges)
+    
+    def prewarm_imports(self):
+        """Import the compiler modules on the UI thread once the window is shown,
+        so the first compile does not pay for them"""
+        import lexer, parser, semantic_analyzer, ir_generator, optimizer, interpreter
     
     def compile_and_run(self):
-        """Compile and run the code"""
-        source_code = self.editor.get('1.0', tk.END)
+        """Compile and run the code on a worker thread"""
+        # Ignore repeated clicks while a compilation is still running
+        if self.compile_button.instate(['disabled']):
+            return
         
-        # Clear outputs
-        self.clear_output()
-        self.append_console("Compiling...\n", "info")
-        self.status_bar.config(text="Compiling...")
-        self.root.update()
+        # Nothing to compile - skip the pipeline entirely
+        source_code = self.get_source()
+        if not source_code.strip():
+            self.clear_output()
+            self.append_output("(No output)")
+            self.status_bar.config(text="Ready")
+            return
+        
+        self.compile_button.config(state='disabled')
         
         try:
-            # Phase 1: Lexical Analysis
-            lexer = Lexer(source_code)
-            tokens = list(lexer.tokenize())
-            if self.verbose_var.get():
-                self.append_console(f"✓ Lexical analysis: {len(tokens)} tokens\n", "success")
+            # Clear outputs
+            self.clear_output()
+            self.append_console("Compiling...\n", "info")
+            self.status_bar.config(text="Compiling...")
+            self.root.update_idletasks()
+            
+            # Tk variables must be read on the main thread
+            optimize = self.optimize_var.get()
+            verbose = self.verbose_var.get()
             
-            # Phase 2: Parsing
-            parser = Parser(tokens)
-            ast = parser.parse()
-            if self.verbose_var.get():
-                self.append_console("✓ Parsing complete\n", "success")
+            threading.Thread(target=self._do_compile, args=(source_code, optimize, verbose),
+                             daemon=True).start()
+        except Exception:
+            self.compile_button.config(state='normal')
+            raise
+        
+        self.root.after(UI_POLL_MS, self._drain_ui_queue)
+    
+    def _post(self, func, *args):
+        """Schedule a GUI update from the worker thread"""
+        self._ui_queue.put((func, args))
+    
+    def _drain_ui_queue(self):
+        """Apply GUI updates posted by the worker thread"""
+        # Keep the output panels enabled for the whole batch
+        with self.writable(self.output), self.writable(self.console):
+            while True:
+                try:
+                    func, args = self._ui_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if func is None:
+                    # Worker finished
+                    self.compile_button.config(state='normal')
+                    return
+                func(*args)
+        self.root.after(UI_POLL_MS, self._drain_ui_queue)
+    
+    def _do_compile(self, source_code, optimize, verbose):
+        """Run the compilation pipeline (worker thread)"""
+        # Compiler modules are imported on first use to speed up startup
+        from lexer import Lexer
+        from parser import Parser
+        from semantic_analyzer import SemanticAnalyzer
+        from ir_generator import IRGenerator
+        from optimizer import Optimizer
+        from interpreter import Interpreter
+        
+        post = self._post
+        
+        try:
+            key = hashlib.blake2b(source_code.encode()).digest()
+            # IR per source hash: {False: raw code, True: optimized code,
+            # 'temps': the generator's temporary names}
+            entry = self._compile_cache.get(key)
             
-            # Phase 3: Semantic Analysis
-            analyzer = SemanticAnalyzer()
-            analyzer.analyze(ast)
-            if self.verbose_var.get():
-                self.append_console("✓ Semantic analysis complete\n", "success")
+            if entry is not None:
+                # Unchanged source - reuse the previous front-end results
+                self._compile_cache.move_to_end(key)
+                if verbose:
+                    post(self.append_console, "✓ Using cached compilation\n", "success")
+            else:
+                # Phase 1: Lexical Analysis
+                lexer = Lexer(source_code)
+                tokens = list(lexer.tokenize())
+                if verbose:
+                    post(self.append_console, f"✓ Lexical analysis: {len(tokens)} tokens\n", "success")
+                
+                # Phase 2: Parsing
+                parser = Parser(tokens)
+                ast = parser.parse()
+                if verbose:
+                    post(self.append_console, "✓ Parsing complete\n", "success")
+                
+                # Phase 3: Semantic Analysis
+                analyzer = SemanticAnalyzer()
+                analyzer.analyze(ast)
+                if verbose:
+                    post(self.append_console, "✓ Semantic analysis complete\n", "success")
+                
+                # Phase 4: IR Generation
+                ir_gen = IRGenerator()
+                ir_gen.generate(ast)
+                if verbose:
+                    post(self.append_console, f"✓ IR generation: {len(ir_gen.code)} instructions\n", "success")
+                
+                entry = {False: ir_gen.code, 'temps': ir_gen.temps}
+                
+                # Remember the results, evicting the least recently used entry
+                self._compile_cache[key] = entry
+                if len(self._compile_cache) > COMPILE_CACHE_SIZE:
+                    self._compile_cache.popitem(last=False)
             
-            # Phase 4: IR Generation
-            ir_gen = IRGenerator()
-            ir_gen.generate(ast)
-            if self.verbose_var.get():
-                self.append_console(f"✓ IR generation: {len(ir_gen.code)} instructions\n", "success")
+            raw_code = entry[False]
             
             # Display IR
-            self.display_ir(ir_gen.code)
+            post(self.display_ir, raw_code)
             
-            code = ir_gen.code
+            code = raw_code
             
             # Phase 5: Optimization
-            if self.optimize_var.get():
-                optimizer = Optimizer(code)
-                code = optimizer.optimize()
-                if self.verbose_var.get():
-                    self.append_console(f"✓ Optimization: {len(ir_gen.code)} → {len(code)} instructions\n", "success")
+            if optimize:
+                code = entry.get(True)
+                if code is None:
+                    # Optimized lazily, the first time it is requested
+                    optimizer = Optimizer(raw_code, entry['temps'])
+                    code = entry[True] = optimizer.optimize()
+                if verbose:
+                    post(self.append_console, f"✓ Optimization: {len(raw_code)} → {len(code)} instructions\n", "success")
             
             # Phase 6: Execution
             interpreter = Interpreter(code)
             
-            # Capture output
-            output_buffer = io.StringIO()
-            with redirect_stdout(output_buffer):
-                interpreter.execute()
+            # Stream output to the output panel as the program runs
+            writer = TkWriter(lambda text: post(self.append_output, text))
+            try:
+                with redirect_stdout(writer):
+                    interpreter.execute()
+            finally:
+                writer.flush()
             
-            # Display output
-            output_text = output_buffer.getvalue()
-            if output_text:
-                self.append_output(output_text)
-            else:
-                self.append_output("(No output)")
+            if not writer.written:
+                post(self.append_output, "(No output)")
             
-            self.append_console("\n✓ Compilation and execution successful!\n", "success")
-            self.status_bar.config(text="Compilation successful")
+            post(self.append_console, "\n✓ Compilation and execution successful!\n", "success")
+            post(lambda: self.status_bar.config(text="Compilation successful"))
             
         except SyntaxError as e:
-            self.append_console(f"\n❌ Syntax Error: {e}\n", "error")
-            self.status_bar.config(text="Syntax Error")
-            messagebox.showerror("Syntax Error", str(e))
+            post(self.report_error, "Syntax Error", e)
             
         except RuntimeError as e:
-            self.append_console(f"\n❌ Runtime Error: {e}\n", "error")
-            self.status_bar.config(text="Runtime Error")
-            messagebox.showerror("Runtime Error", str(e))
+            post(self.report_error, "Runtime Error", e)
             
         except Exception as e:
-            self.append_console(f"\n❌ Error: {e}\n", "error")
-            self.status_bar.config(text="Error")
-            messagebox.showerror("Error", str(e))
+            post(self.report_error, "Error", e)
+        
+        finally:
+            post(None)
+    
+    def report_error(self, title, error):
+        """Show a compilation or runtime error"""
+        self.append_console(f"\n❌ {title}: {error}\n", "error")
+        self.status_bar.config(text=title)
+        messagebox.showerror(title, str(error))
+    
+    @contextmanager
+    def writable(self, widget):
+        """Temporarily enable a read-only text widget for a batch of writes"""
+        if widget in self._writable_widgets:
+            # Already enabled by an enclosing batch
+            yield widget
+            return
+        widget.config(state='normal')
+        self._writable_widgets.add(widget)
+        try:
+            yield widget
+        finally:
+            self._writable_widgets.discard(widget)
+            widget.config(state='disabled')
     
     def display_ir(self, code):
         """Display IR code"""
-        self.ir_view.config(state='normal')
-        self.ir_view.delete('1.0', tk.END)
-        for i, instr in enumerate(code):
-            self.ir_view.insert(tk.END, f"{i:3d}: {instr}\n")
-        self.ir_view.config(state='disabled')
+        with self.writable(self.ir_view) as view:
+            view.delete('1.0', tk.END)
+            text = ''.join(f"{i:3d}: {instr}\n" for i, instr in enumerate(code))
+            view.insert('1.0', text)
     
     def append_output(self, text):
         """Append text to output"""
-        self.output.config(state='normal')
-        self.output.insert(tk.END, text)
-        self.output.see(tk.END)
-        self.output.config(state='disabled')
+        with self.writable(self.output) as output:
+            output.insert(tk.END, text)
+            output.see(tk.END)
     
     def append_console(self, text, style="normal"):
         """Append text to console"""
-        self.console.config(state='normal')
-        
-        # Configure tags for different styles
-        self.console.tag_configure("error", foreground="#f48771")
-        self.console.tag_configure("success", foreground="#73c991")
-        self.console.tag_configure("info", foreground="#89d8ff")
-        
-        if style != "normal":
-            self.console.insert(tk.END, text, style)
-        else:
-            self.console.insert(tk.END, text)
-        
-        self.console.see(tk.END)
-        self.console.config(state='disabled')
+        with self.writable(self.console) as console:
+            if style != "normal":
+                console.insert(tk.END, text, style)
+            else:
+                console.insert(tk.END, text)
+            console.see(tk.END)
     
     def clear_output(self):
         """Clear all output windows"""
-        self.output.config(state='normal')
-        self.output.delete('1.0', tk.END)
-        self.output.config(state='disabled')
-        
-        self.console.config(state='normal')
-        self.console.delete('1.0', tk.END)
-        self.console.config(state='disabled')
-        
-        self.ir_view.config(state='normal')
-        self.ir_view.delete('1.0', tk.END)
-        self.ir_view.config(state='disabled')
+        for widget in (self.output, self.console, self.ir_view):
+            with self.writable(widget):
+                widget.delete('1.0', tk.END)
     
     def clear_editor(self):
         """Clear editor"""
         if messagebox.askyesno("Clear Editor", "Are you sure you want to clear the editor?"):
-            self.editor.delete('1.0', tk.END)
+            self.set_source('')
             self.update_line_numbers()
     
     def open_file(self):
@@ -338,10 +580,8 @@ class CompilerGUI:
         )
         if filename:
             try:
-                with open(filename, 'r') as f:
-                    content = f.read()
-                self.editor.delete('1.0', tk.END)
-                self.editor.insert('1.0', content)
+                content = Path(filename).read_text(encoding='utf-8')
+                self.set_source(content)
                 self.update_line_numbers()
                 self.apply_syntax_highlighting()
                 self.status_bar.config(text=f"Opened: {filename}")
@@ -357,15 +597,26 @@ class CompilerGUI:
         )
         if filename:
             try:
-                with open(filename, 'w') as f:
-                    content = self.editor.get('1.0', tk.END)
-                    f.write(content)
+                Path(filename).write_text(self.get_source(), encoding='utf-8')
                 self.status_bar.config(text=f"Saved: {filename}")
             except Exception as e:
                 messagebox.showerror("Error", f"Could not save file: {e}")
     
     def show_examples(self):
         """Show examples menu"""
+        examples_dir = Path("examples")
+        
+        # Reuse the window from an earlier click
+        examples_window = self._examples_window
+        if examples_window is not None and examples_window.winfo_exists():
+            if examples_dir.exists():
+                self.fill_examples_list(examples_dir)
+                examples_window.deiconify()
+                examples_window.lift()
+                return
+            examples_window.destroy()
+            self._examples_window = None
+        
         examples_window = tk.Toplevel(self.root)
         examples_window.title("Example Programs")
         examples_window.geometry("400x500")
@@ -374,13 +625,11 @@ class CompilerGUI:
                  font=("Arial", 12, "bold")).pack(pady=10)
         
         # List of examples
-        examples_dir = Path("examples")
         if examples_dir.exists():
             listbox = tk.Listbox(examples_window, font=("Consolas", 10))
             listbox.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-            
-            for file in sorted(examples_dir.glob("*.nc")):
-                listbox.insert(tk.END, file.name)
+            self._examples_listbox = listbox
+            self.fill_examples_list(examples_dir, refill=True)
             
             def load_selected():
                 selection = listbox.curselection()
@@ -388,21 +637,37 @@ class CompilerGUI:
                     filename = listbox.get(selection[0])
                     filepath = examples_dir / filename
                     try:
-                        with open(filepath, 'r') as f:
-                            content = f.read()
-                        self.editor.delete('1.0', tk.END)
-                        self.editor.insert('1.0', content)
+                        content = filepath.read_text(encoding='utf-8')
+                        self.set_source(content)
                         self.update_line_numbers()
                         self.apply_syntax_highlighting()
                         self.status_bar.config(text=f"Loaded: {filename}")
-                        examples_window.destroy()
+                        examples_window.withdraw()
                     except Exception as e:
                         messagebox.showerror("Error", f"Could not load example: {e}")
             
             ttk.Button(examples_window, text="Load", command=load_selected).pack(pady=10)
+            
+            # Hide instead of destroying, so the next click only shows it again
+            examples_window.protocol("WM_DELETE_WINDOW", examples_window.withdraw)
+            self._examples_window = examples_window
         else:
             ttk.Label(examples_window, text="No examples directory found").pack(pady=20)
     
+    def fill_examples_list(self, examples_dir: Path, refill: bool = False):
+        """List the example files, rescanning the directory only when its mtime changed"""
+        mtime = examples_dir.stat().st_mtime
+        if self._examples_cache is not None and self._examples_cache[0] == mtime:
+            if not refill:
+                return  # The listbox already shows these files
+            names = self._examples_cache[1]
+        else:
+            names = [file.name for file in sorted(examples_dir.glob("*.nc"))]
+            self._examples_cache = (mtime, names)
+        
+        self._examples_listbox.delete(0, tk.END)
+        self._examples_listbox.insert(tk.END, *names)
+    
     def load_example(self):
         """Load default example"""
         example_code = """// Factorial Calculator
@@ -421,7 +686,7 @@ while (i <= 5) {
     i = i + 1;
 }
 """
-        self.editor.insert('1.0', example_code)
+        self.set_source(example_code)
         self.update_line_numbers()
         self.apply_syntax_highlighting()
 
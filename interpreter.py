@@ -4,8 +4,9 @@ Phase 6: Executes the intermediate code (three-address code)
 Acts as a virtual machine interpreter
 """
 
-from ir_generator import ThreeAddressCode
-from typing import Dict, List, Any, Optional
+from ir_generator import StringLiteral, ThreeAddressCode
+from typing import Dict, List, Any, Optional, Callable, Tuple
+import operator
 import sys
 
 
@@ -14,19 +15,147 @@ class RuntimeError(Exception):
     pass
 
 
+# Operand kinds, resolved once when the program is loaded
+CONST = 'c'
+VAR = 'v'
+
+# Value of a variable slot that has not been assigned yet
+UNSET = object()
+
+# Ops whose result names a label rather than a variable
+LABEL_OPS = frozenset(['label', 'goto', 'if_false', 'if_true'])
+
+# Ops whose arg1 names a function rather than a variable
+FUNCTION_OPS = frozenset(['call', 'begin_func', 'end_func'])
+
+Operand = Tuple[str, Any]
+
+# Instruction handler: takes the instruction and its pc, returns the next pc
+# when it jumps (None to fall through)
+Handler = Callable[['Instruction', int], Optional[int]]
+
+# Operations the loader may evaluate when both operands are numeric literals
+FOLDABLE_OPS: Dict[str, Callable[[Any, Any], Any]] = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': lambda left, right: left // right if isinstance(left, int) and isinstance(right, int) else left / right,
+    '%': operator.mod,
+    '**': operator.pow,
+    '<': operator.lt,
+    '>': operator.gt,
+    '<=': operator.le,
+    '>=': operator.ge,
+    '==': operator.eq,
+    '!=': operator.ne,
+    'and': lambda left, right: left and right,
+    'or': lambda left, right: left or right,
+}
+
+# Static types used to specialize handlers (bool behaves as int in arithmetic)
+INT_TYPES = (int, bool)
+NUMERIC_TYPES = (int, bool, float)
+
+# Result types of ops whose result type does not depend on their operands
+RESULT_TYPES: Dict[str, Optional[type]] = {
+    '<': bool, '>': bool, '<=': bool, '>=': bool, '==': bool, '!=': bool,
+    'not': bool,
+    '**': None,
+    'builtin_len': int,
+    'builtin_random': int,
+    'builtin_substr': str,
+    'builtin_concat': str,
+    'builtin_input': str,
+}
+
+# Printed values buffered before they are written to stdout
+PRINT_BUFFER_SIZE = 256
+
+# Calls after which a function is compiled to Python
+JIT_THRESHOLD = 20
+
+# Nesting depth of compiled calls before falling back to the interpreter
+# (compiled functions recurse on the Python stack)
+MAX_NATIVE_DEPTH = 200
+
+# Largest literal exponent folded at load time
+MAX_FOLDED_EXPONENT = 256
+
+
+class Instruction:
+    """An instruction with its operands resolved to (kind, payload) pairs"""
+    
+    __slots__ = ('op', 'arg1', 'arg2', 'result', 'a1', 'a2', 'r', 'params', 'param_idx')
+    
+    def __init__(self, instr: ThreeAddressCode, a1: Operand, a2: Operand, r: Optional[int]):
+        # Original operands are kept for diagnostics
+        self.op = instr.op
+        self.arg1 = instr.arg1
+        self.arg2 = instr.arg2
+        self.result = instr.result
+        self.a1 = a1
+        self.a2 = a2
+        self.r = r  # Result variable slot
+        self.params: Tuple[Operand, ...] = ()  # Argument operands of a call
+        self.param_idx = 0  # Position of a declared parameter
+    
+    def __repr__(self):
+        return repr(ThreeAddressCode(self.op, self.arg1, self.arg2, self.result))
+
+
+class FunctionScope:
+    """Local variable layout of a function's activation records"""
+    
+    __slots__ = ('name', 'local_of', 'slots')
+    
+    def __init__(self, name: str):
+        self.name = name
+        self.local_of: Dict[int, int] = {}  # Global slot -> local slot
+        self.slots: List[int] = []  # Local slot -> global slot
+    
+    def local(self, slot: int) -> int:
+        """Get the local slot for a global slot, allocating one if needed"""
+        local = self.local_of.get(slot)
+        if local is None:
+            local = self.local_of[slot] = len(self.slots)
+            self.slots.append(slot)
+        return local
+
+
 class Interpreter:
     """Interprets and executes three-address code"""
     
     def __init__(self, code: List[ThreeAddressCode]):
         self.code = code
-        self.variables: Dict[str, Any] = {}  # Variable storage
+        self.variables: List[Any] = []  # Variables of the running scope, indexed by slot
+        self.globals: List[Any] = []  # Variables of the main program
         self.functions: Dict[str, int] = {}  # Function name -> start index
+        self.scopes: Dict[int, FunctionScope] = {}  # Function start index -> scope
         self.call_stack: List[Dict] = []  # Function call stack
+        self._args_stack: List[List[Any]] = []  # Arguments of each active call
         self.pc = 0  # Program counter
         self.output: List[str] = []  # Captured output
+        self._out_buf: List[str] = []  # Printed values not yet written to stdout
+        
+        # Hot functions compiled to Python (see jit.py), keyed by start index;
+        # None marks a function that cannot be compiled
+        self._natives: Dict[int, Optional[Callable]] = {}
+        self._call_counts: Dict[int, int] = {}
+        self._natives_enabled = True
+        
+        # Instructions with operands resolved for execution
+        self._slot_of: Dict[str, int] = {}  # Variable name -> slot
+        self._operand_cache: Dict[str, Operand] = {}  # Operand string -> resolved operand
+        self._program = [self._decode(instr) for instr in code]
+        self.globals = [UNSET] * len(self._slot_of)
+        self.variables = self.globals
         
         # Build function table
         self._build_function_table()
+        self._localize_functions()
+        self._fold_constants()
+        self._resolve_labels()
+        self._build_dispatch_table()
     
     def _build_function_table(self):
         """Build table of function start addresses"""
@@ -34,354 +163,810 @@ class Interpreter:
             if instr.op == 'begin_func':
                 self.functions[instr.arg1] = i + 1
     
+    def _localize_functions(self):
+        """Renumber the variables used inside each function to local slots"""
+        open_scopes: List[FunctionScope] = []
+        param_counts: List[int] = []
+        for i, instr in enumerate(self._program):
+            if instr.op == 'begin_func':
+                scope = FunctionScope(instr.arg1)
+                self.scopes[i + 1] = scope
+                open_scopes.append(scope)
+                param_counts.append(0)
+                continue
+            if instr.op == 'end_func':
+                if open_scopes:
+                    open_scopes.pop()
+                    param_counts.pop()
+                continue
+            if not open_scopes:
+                continue
+            
+            if instr.op == 'param_decl':
+                # Parameters are declared in argument order
+                instr.param_idx = param_counts[-1]
+                param_counts[-1] += 1
+            
+            scope = open_scopes[-1]
+            if instr.arg1.__class__ is tuple:
+                instr.a1 = (CONST, tuple(self._localize(scope, arg) for arg in instr.a1[1]))
+            else:
+                instr.a1 = self._localize(scope, instr.a1)
+            if instr.arg2.__class__ is tuple:
+                instr.a2 = (CONST, tuple(self._localize(scope, arg) for arg in instr.a2[1]))
+            else:
+                instr.a2 = self._localize(scope, instr.a2)
+            if instr.r is not None:
+                instr.r = scope.local(instr.r)
+    
+    @staticmethod
+    def _localize(scope: FunctionScope, operand: Operand) -> Operand:
+        """Map a variable operand to its slot in a function scope"""
+        if operand[0] is VAR:
+            return (VAR, scope.local(operand[1]))
+        return operand
+    
+    def _fold_constants(self):
+        """Evaluate literal operations at load time and forward the results"""
+        # Slots holding a known constant within the current straight-line run
+        known: Dict[int, Any] = {}
+        for instr in self._program:
+            op = instr.op
+            if op in ('label', 'begin_func', 'end_func'):
+                # Control can enter here from elsewhere (or the slots change meaning)
+                known.clear()
+                continue
+            
+            if known:
+                if instr.arg1.__class__ is tuple:
+                    instr.a1 = (CONST, tuple(self._substitute(arg, known) for arg in instr.a1[1]))
+                else:
+                    instr.a1 = self._substitute(instr.a1, known)
+                if instr.a2[0] is VAR:
+                    instr.a2 = self._substitute(instr.a2, known)
+            
+            if instr.a1[0] is CONST and instr.r is not None:
+                value = self._fold(instr)
+                if value is not UNSET:
+                    instr.op = 'assign'
+                    instr.arg1 = value
+                    instr.arg2 = None
+                    instr.a1 = (CONST, value)
+                    instr.a2 = (CONST, None)
+            
+            if instr.r is not None:
+                if op != 'param_decl' and instr.op == 'assign' and instr.a1[0] is CONST:
+                    known[instr.r] = instr.a1[1]
+                else:
+                    known.pop(instr.r, None)
+    
+    @staticmethod
+    def _substitute(operand: Operand, known: Dict[int, Any]) -> Operand:
+        """Replace a variable operand whose value is known by the constant"""
+        if operand[0] is VAR and operand[1] in known:
+            return (CONST, known[operand[1]])
+        return operand
+    
+    @staticmethod
+    def _fold(instr: Instruction) -> Any:
+        """Evaluate an operation on literal operands, or return UNSET"""
+        left = instr.a1[1]
+        if instr.op == 'not':
+            return not left if isinstance(left, (int, float)) else UNSET
+        
+        func = FOLDABLE_OPS.get(instr.op)
+        if func is None or instr.a2[0] is not CONST:
+            return UNSET
+        right = instr.a2[1]
+        
+        # Only numbers are folded; anything that fails is left to raise at runtime
+        if not isinstance(left, (int, float)) or not isinstance(right, (int, float)):
+            return UNSET
+        if instr.op == '**' and abs(right) > MAX_FOLDED_EXPONENT:
+            return UNSET
+        try:
+            return func(left, right)
+        except (ArithmeticError, ValueError):
+            return UNSET
+    
+    def _resolve_labels(self):
+        """Resolve jump labels, function ends and call arguments in a single pass"""
+        self.labels: Dict[str, int] = {}
+        for i, instr in enumerate(self.code):
+            if instr.op == 'label':
+                self.labels.setdefault(instr.result, i)
+        
+        # Jump target of each instruction, indexed by pc (None if not a jump)
+        self._targets: List[Optional[int]] = [None] * len(self.code)
+        open_funcs = []
+        for i, instr in enumerate(self.code):
+            op = instr.op
+            if op in ('goto', 'if_false', 'if_true'):
+                self._targets[i] = self.labels.get(instr.result)
+            elif op == 'begin_func':
+                # Skip to the end of the function unless it is closed below
+                self._targets[i] = len(self.code)
+                open_funcs.append(i)
+            elif op == 'end_func' and open_funcs:
+                self._targets[open_funcs.pop()] = i + 1  # Position AFTER end_func
+            elif op == 'call':
+                # Arguments come from the param instructions just before the call
+                params = []
+                for k in range(i - instr.arg2, i):
+                    param_instr = self._program[k]
+                    if param_instr.op == 'param':
+                        params.append(param_instr.a1)
+                self._program[i].params = tuple(params)
+    
+    def _jump(self, instr: Instruction, pc: int) -> int:
+        """Get the resolved jump target of the instruction at pc"""
+        target = self._targets[pc]
+        if target is None:
+            raise RuntimeError(f"Label not found: {instr.result}")
+        return target
+    
+    def _build_dispatch_table(self):
+        """Map every opcode to its handler and resolve each instruction once"""
+        self._handlers: Dict[str, Handler] = {
+            'assign': self._op_assign,
+            '+': self._op_add,
+            '-': self._op_sub,
+            '*': self._op_mul,
+            '**': self._op_pow,
+            '<': self._op_lt,
+            '>': self._op_gt,
+            '<=': self._op_le,
+            '>=': self._op_ge,
+            '==': self._op_eq,
+            '!=': self._op_ne,
+            'and': self._op_and,
+            'or': self._op_or,
+            '/': self._op_divide,
+            '%': self._op_modulo,
+            'not': self._op_not,
+            'label': self._op_nop,
+            'goto': self._op_goto,
+            'if_false': self._op_if_false,
+            'if_true': self._op_if_true,
+            'print': self._op_print,
+            'param': self._op_nop,
+            'param_decl': self._op_param_decl,
+            'call': self._op_call,
+            'return': self._op_return,
+            'begin_func': self._op_begin_func,
+            'end_func': self._op_nop,
+            'array_init_list': self._op_array_init_list,
+            'array_get': self._op_array_get,
+            'array_set': self._op_array_set,
+            'builtin_len': self._op_builtin_len,
+            'builtin_random': self._op_builtin_random,
+            'builtin_substr': self._op_builtin_substr,
+            'builtin_concat': self._op_builtin_concat,
+            'builtin_input': self._op_builtin_input,
+        }
+        
+        # Handler for each instruction, indexed by pc
+        types = self._infer_types()
+        self._dispatch = [self._select_handler(instr, types) for instr in self._program]
+        
+        # (handler, instruction) per pc, so each step is a single fetch
+        self._steps = list(zip(self._dispatch, self._program))
+    
+    def _select_handler(self, instr: Instruction, types: Dict[str, type]) -> Handler:
+        """Pick the handler for an instruction, specializing on its operand types"""
+        if instr.op == '/':
+            # Known numeric operands - decide integer vs float division now
+            left = self._operand_type(instr.a1, instr.arg1, types)
+            right = self._operand_type(instr.a2, instr.arg2, types)
+            if left in INT_TYPES and right in INT_TYPES:
+                return self._op_idiv
+            if left in NUMERIC_TYPES and right in NUMERIC_TYPES:
+                return self._op_fdiv
+        # Unknown ops are no-ops
+        return self._handlers.get(instr.op, self._op_nop)
+    
+    @staticmethod
+    def _operand_type(operand: Operand, name, types: Dict[str, type]) -> Optional[type]:
+        """Get the static type of an operand (None if unknown)"""
+        if operand[0] is CONST:
+            return type(operand[1])
+        return types.get(name)
+    
+    def _infer_types(self) -> Dict[str, type]:
+        """Infer the value type of each variable name, where every definition agrees"""
+        # A name is typed only if all of its definitions, anywhere in the
+        # program, produce the same type - function frames copy values by
+        # name, so this holds for every slot the name is given.
+        types: Dict[str, Optional[type]] = {}
+        changed = True
+        while changed:
+            changed = False
+            for instr in self._program:
+                if instr.r is None:
+                    continue
+                name = instr.arg1 if instr.op == 'param_decl' else instr.result
+                if types.get(name, UNSET) is None:
+                    continue
+                result = self._result_type(instr, types)
+                if result is UNSET:
+                    # Depends on a name with no typed definition yet
+                    continue
+                old = types.get(name, UNSET)
+                new = result if old is UNSET or old is result else None
+                if new is not old:
+                    types[name] = new
+                    changed = True
+        return {name: t for name, t in types.items() if t is not None}
+    
+    def _result_type(self, instr: Instruction, types: Dict[str, Optional[type]]) -> Any:
+        """Get the type an instruction stores (None if unknown, UNSET if not known yet)"""
+        op = instr.op
+        if op in RESULT_TYPES:
+            return RESULT_TYPES[op]
+        if op not in ('assign', '+', '-', '*', '/', '%', 'and', 'or'):
+            return None
+        
+        left = types.get(instr.arg1, UNSET) if instr.a1[0] is VAR else type(instr.a1[1])
+        if op == 'assign':
+            return left
+        right = types.get(instr.arg2, UNSET) if instr.a2[0] is VAR else type(instr.a2[1])
+        if left is None or right is None:
+            return None
+        if left is UNSET or right is UNSET:
+            return UNSET
+        if op in ('and', 'or'):
+            return left if left is right else None
+        if left in INT_TYPES and right in INT_TYPES:
+            return int
+        if left in NUMERIC_TYPES and right in NUMERIC_TYPES:
+            return float
+        return None
+    
     def execute(self) -> List[str]:
         """Execute the program"""
-        self.pc = 0
-        
-        while self.pc < len(self.code):
-            instr = self.code[self.pc]
-            old_pc = self.pc
-            self.execute_instruction(instr)
-            # Only increment pc if instruction didn't change it
-            if self.pc == old_pc:
-                self.pc += 1
+        try:
+            self._run(0)
+        finally:
+            # Output printed before an error is still shown
+            self._flush_output()
         
         return self.output
     
+    def _run(self, pc: int):
+        """Run instructions from pc until control leaves the program"""
+        steps = self._steps
+        n = len(steps)
+        
+        try:
+            while pc < n:
+                # Handlers return the next pc when they jump
+                handler, instr = steps[pc]
+                next_pc = handler(instr, pc)
+                pc = pc + 1 if next_pc is None else next_pc
+        finally:
+            self.pc = pc
+    
+    def _flush_output(self):
+        """Write buffered print output to stdout"""
+        if self._out_buf:
+            sys.stdout.write(' '.join(self._out_buf) + ' ')
+            sys.stdout.flush()
+            self._out_buf.clear()
+    
     def execute_instruction(self, instr: ThreeAddressCode):
         """Execute a single instruction"""
+        decoded = self._decode(instr)
+        self._grow_variables()
+        next_pc = self._handlers.get(instr.op, self._op_nop)(decoded, self.pc)
+        if next_pc is not None:
+            self.pc = next_pc
+    
+    def _op_nop(self, instr: Instruction, pc: int):
+        # Labels, params and function end markers - nothing to do
+        pass
+    
+    def _op_assign(self, instr: Instruction, pc: int):
+        # Assignment: result = arg1
+        self.variables[instr.r] = self._v(instr.a1)
+    
+    def _op_add(self, instr: Instruction, pc: int):
+        # Arithmetic operations
+        self.variables[instr.r] = self._v(instr.a1) + self._v(instr.a2)
+    
+    def _op_sub(self, instr: Instruction, pc: int):
+        self.variables[instr.r] = self._v(instr.a1) - self._v(instr.a2)
+    
+    def _op_mul(self, instr: Instruction, pc: int):
+        self.variables[instr.r] = self._v(instr.a1) * self._v(instr.a2)
+    
+    def _op_pow(self, instr: Instruction, pc: int):
+        self.variables[instr.r] = self._v(instr.a1) ** self._v(instr.a2)
+    
+    def _op_lt(self, instr: Instruction, pc: int):
+        # Relational operations
+        self.variables[instr.r] = self._v(instr.a1) < self._v(instr.a2)
+    
+    def _op_gt(self, instr: Instruction, pc: int):
+        self.variables[instr.r] = self._v(instr.a1) > self._v(instr.a2)
+    
+    def _op_le(self, instr: Instruction, pc: int):
+        self.variables[instr.r] = self._v(instr.a1) <= self._v(instr.a2)
+    
+    def _op_ge(self, instr: Instruction, pc: int):
+        self.variables[instr.r] = self._v(instr.a1) >= self._v(instr.a2)
+    
+    def _op_eq(self, instr: Instruction, pc: int):
+        self.variables[instr.r] = self._v(instr.a1) == self._v(instr.a2)
+    
+    def _op_ne(self, instr: Instruction, pc: int):
+        self.variables[instr.r] = self._v(instr.a1) != self._v(instr.a2)
+    
+    def _op_and(self, instr: Instruction, pc: int):
+        # Logical operations
+        left = self._v(instr.a1)
+        right = self._v(instr.a2)
+        self.variables[instr.r] = left and right
+    
+    def _op_or(self, instr: Instruction, pc: int):
+        left = self._v(instr.a1)
+        right = self._v(instr.a2)
+        self.variables[instr.r] = left or right
+    
+    def _op_divide(self, instr: Instruction, pc: int):
+        left = self._v(instr.a1)
+        right = self._v(instr.a2)
+        if right == 0:
+            raise RuntimeError("Division by zero")
+        if type(left) in INT_TYPES and type(right) in INT_TYPES:
+            result = left // right
+        else:
+            result = left / right
+        self.variables[instr.r] = result
+    
+    def _op_idiv(self, instr: Instruction, pc: int):
+        # Division where both operands are statically known to be ints
+        right = self._v(instr.a2)
+        if right == 0:
+            raise RuntimeError("Division by zero")
+        self.variables[instr.r] = self._v(instr.a1) // right
+    
+    def _op_fdiv(self, instr: Instruction, pc: int):
+        # Division where both operands are known numbers, at least one a float
+        right = self._v(instr.a2)
+        if right == 0:
+            raise RuntimeError("Division by zero")
+        self.variables[instr.r] = self._v(instr.a1) / right
+    
+    def _op_modulo(self, instr: Instruction, pc: int):
+        left = self._v(instr.a1)
+        right = self._v(instr.a2)
+        if right == 0:
+            raise RuntimeError("Modulo by zero")
+        self.variables[instr.r] = left % right
+    
+    def _op_not(self, instr: Instruction, pc: int):
+        # Logical NOT
+        self.variables[instr.r] = not self._v(instr.a1)
+    
+    def _op_goto(self, instr: Instruction, pc: int):
+        # Unconditional jump
+        return self._jump(instr, pc)
+    
+    def _op_if_false(self, instr: Instruction, pc: int):
+        # Conditional jump (if arg1 is false, goto label)
+        if not self._v(instr.a1):
+            return self._jump(instr, pc)
+        return None
+    
+    def _op_if_true(self, instr: Instruction, pc: int):
+        # Conditional jump (if arg1 is true, goto label)
+        if self._v(instr.a1):
+            return self._jump(instr, pc)
+        return None
+    
+    def _op_print(self, instr: Instruction, pc: int):
+        # Print value
+        self._print_value(self._v(instr.a1))
+    
+    def _print_value(self, value: Any):
+        """Print a value, buffering the output"""
+        output_str = str(value)
+        self.output.append(output_str)
+        self._out_buf.append(output_str)
+        if len(self._out_buf) >= PRINT_BUFFER_SIZE:
+            self._flush_output()
+    
+    def _op_param_decl(self, instr: Instruction, pc: int):
+        # Declare a parameter variable (values come from the call's arguments)
+        if self._args_stack:
+            args = self._args_stack[-1]
+            if instr.param_idx < len(args):
+                self.variables[instr.r] = args[instr.param_idx]
+    
+    def _op_call(self, instr: Instruction, pc: int):
+        # Function call
+        func_name = instr.arg1
+        if func_name not in self.functions:
+            raise RuntimeError(f"Undefined function: {func_name}")
+        start = self.functions[func_name]
+        scope = self.scopes[start]
         
-        if instr.op == 'assign':
-            # Assignment: result = arg1
-            value = self.get_value(instr.arg1)
-            self.variables[instr.result] = value
+        if self._natives_enabled:
+            native = self._natives.get(start, UNSET)
+            if native is UNSET:
+                native = self._count_call(start)
+            if native is not None:
+                return self._op_call_native(instr, native, scope)
         
-        elif instr.op in ['+', '-', '*', '/', '%', '**']:
-            # Arithmetic operations
-            left = self.get_value(instr.arg1)
-            right = self.get_value(instr.arg2)
-            
-            if instr.op == '+':
-                result = left + right
-            elif instr.op == '-':
-                result = left - right
-            elif instr.op == '*':
-                result = left * right
-            elif instr.op == '/':
-                if right == 0:
-                    raise RuntimeError("Division by zero")
-                if isinstance(left, int) and isinstance(right, int):
-                    result = left // right
-                else:
-                    result = left / right
-            elif instr.op == '%':
-                if right == 0:
-                    raise RuntimeError("Modulo by zero")
-                result = left % right
-            elif instr.op == '**':
-                result = left ** right
-            
-            self.variables[instr.result] = result
+        # Get parameters from previous param instructions
+        self._args_stack.append([self._v(param) for param in instr.params])
         
-        elif instr.op in ['<', '>', '<=', '>=', '==', '!=']:
-            # Relational operations
-            left = self.get_value(instr.arg1)
-            right = self.get_value(instr.arg2)
-            
-            if instr.op == '<':
-                result = left < right
-            elif instr.op == '>':
-                result = left > right
-            elif instr.op == '<=':
-                result = left <= right
-            elif instr.op == '>=':
-                result = left >= right
-            elif instr.op == '==':
-                result = left == right
-            elif instr.op == '!=':
-                result = left != right
-            
-            self.variables[instr.result] = result
+        # New activation record - the callee starts from the values the
+        # caller sees for the variables it uses, and its writes stay local
+        local_vars = [self._visible_value(slot) for slot in scope.slots]
         
-        elif instr.op in ['and', 'or']:
-            # Logical operations
-            left = self.get_value(instr.arg1)
-            right = self.get_value(instr.arg2)
-            
-            if instr.op == 'and':
-                result = left and right
-            elif instr.op == 'or':
-                result = left or right
-            
-            self.variables[instr.result] = result
-        
-        elif instr.op == 'not':
-            # Logical NOT
-            operand = self.get_value(instr.arg1)
-            self.variables[instr.result] = not operand
-        
-        elif instr.op == 'label':
-            # Label - no operation, just a marker
-            pass
-        
-        elif instr.op == 'goto':
-            # Unconditional jump
-            label = instr.result
-            self.pc = self.find_label(label)
-        
-        elif instr.op == 'if_false':
-            # Conditional jump (if arg1 is false, goto label)
-            condition = self.get_value(instr.arg1)
-            if not condition:
-                label = instr.result
-                self.pc = self.find_label(label)
-        
-        elif instr.op == 'if_true':
-            # Conditional jump (if arg1 is true, goto label)
-            condition = self.get_value(instr.arg1)
-            if condition:
-                label = instr.result
-                self.pc = self.find_label(label)
-        
-        elif instr.op == 'print':
-            # Print value
-            value = self.get_value(instr.arg1)
-            output_str = str(value)
-            self.output.append(output_str)
-            print(output_str, end=' ')
-        
-        elif instr.op == 'param':
-            # Push parameter onto call stack (handled in call)
-            pass
-        
-        elif instr.op == 'param_decl':
-            # Declare a parameter variable (values come from call stack)
-            if self.call_stack:
-                frame = self.call_stack[-1]
-                param_name = instr.arg1
-                # Get the next parameter value from the frame
-                if 'param_index' not in frame:
-                    frame['param_index'] = 0
-                if frame['param_index'] < len(frame['params']):
-                    self.variables[param_name] = frame['params'][frame['param_index']]
-                    frame['param_index'] += 1
-        
-        elif instr.op == 'call':
-            # Function call
-            func_name = instr.arg1
-            num_params = instr.arg2
-            
-            # Save current state - return to instruction AFTER this call
-            return_address = self.pc + 1
-            saved_vars = self.variables.copy()
-            
-            # Get parameters from previous param instructions
-            params = []
-            for i in range(num_params):
-                param_instr = self.code[self.pc - num_params + i]
-                if param_instr.op == 'param':
-                    params.append(self.get_value(param_instr.arg1))
-            
-            # Push call frame
-            self.call_stack.append({
-                'return_address': return_address,
-                'saved_vars': saved_vars,
-                'params': params,
-                'return_value': None
-            })
-            
-            # Jump to function
-            if func_name not in self.functions:
-                raise RuntimeError(f"Undefined function: {func_name}")
-            self.pc = self.functions[func_name]
-        
-        elif instr.op == 'return':
-            # Return from function
-            if not self.call_stack:
-                # Return from main program
-                self.pc = len(self.code)
-                return
-            
-            return_value = None
-            if instr.arg1 is not None:
-                return_value = self.get_value(instr.arg1)
-            
-            # Pop call frame
-            frame = self.call_stack.pop()
-            frame['return_value'] = return_value
-            
-            # Restore state
-            self.variables = frame['saved_vars']
-            
-            # Store return value in result variable
-            if return_value is not None:
-                # Find the call instruction (which is one before return_address)
-                call_pc = frame['return_address'] - 1
-                call_instr = self.code[call_pc]
-                if call_instr.result:
-                    self.variables[call_instr.result] = return_value
-            
-            # Jump back
-            self.pc = frame['return_address']
-        
-        elif instr.op == 'begin_func':
-            # Function begin marker - skip to end
-            func_name = instr.arg1
-            self.pc = self.find_function_end(func_name)
-        
-        elif instr.op == 'end_func':
-            # Function end marker
-            pass
-        
-        elif instr.op == 'array_init':
-            # Initialize empty array
-            self.variables[instr.result] = []
-        
-        elif instr.op == 'array_append':
-            # Append element to array
-            array = self.variables.get(instr.result, [])
-            value = self.get_value(instr.arg1)
-            array.append(value)
-            self.variables[instr.result] = array
-        
-        elif instr.op == 'array_get':
-            # Get array element: result = array[index]
-            array = self.get_value(instr.arg1)
-            index = self.get_value(instr.arg2)
-            
-            if not isinstance(array, list):
-                raise RuntimeError(f"Cannot index non-array type")
-            if not isinstance(index, int):
-                raise RuntimeError(f"Array index must be integer")
-            if index < 0 or index >= len(array):
-                raise RuntimeError(f"Array index out of bounds: {index}")
-            
-            self.variables[instr.result] = array[index]
+        # Push call frame - return to instruction AFTER this call
+        self.call_stack.append({
+            'return_address': pc + 1,
+            'result_slot': instr.r,
+            'caller_vars': self.variables,
+            'scope': scope,
+            'locals': local_vars,
+            'return_value': None
+        })
         
-        elif instr.op == 'array_set':
-            # Set array element: array[index] = value
-            array = self.variables.get(instr.result)
-            if not isinstance(array, list):
-                raise RuntimeError(f"Cannot index non-array type")
-            
-            index = self.get_value(instr.arg1)
-            value = self.get_value(instr.arg2)
-            
-            if not isinstance(index, int):
-                raise RuntimeError(f"Array index must be integer")
-            if index < 0 or index >= len(array):
-                raise RuntimeError(f"Array index out of bounds: {index}")
-            
-            array[index] = value
+        # Jump to function
+        self.variables = local_vars
+        return start
+    
+    def _count_call(self, start: int) -> Optional[Callable]:
+        """Count a call and compile the function once it gets hot"""
+        count = self._call_counts.get(start, 0) + 1
+        self._call_counts[start] = count
+        if count < JIT_THRESHOLD:
+            return None
+        from jit import compile_function
+        native = self._natives[start] = compile_function(self, start)
+        return native
+    
+    def _op_call_native(self, instr: Instruction, native: Callable, scope: FunctionScope):
+        # Call a compiled function - it gets the same arguments and
+        # starting variables as an interpreted call would
+        args = [self._v(param) for param in instr.params]
+        local_vars = [self._visible_value(slot) for slot in scope.slots]
+        return_value = native(local_vars, args, 0)
+        if return_value is not None and instr.r is not None:
+            self.variables[instr.r] = return_value
+        return None
+    
+    def _native_call(self, start: int, local_vars: List[Any], args: List[Any], depth: int) -> Any:
+        """Call made from compiled code, falling back to the interpreter when deep"""
+        if depth < MAX_NATIVE_DEPTH:
+            return self._natives[start](local_vars, args, depth)
+        return self._call_interpreted(start, local_vars, args)
+    
+    def _call_interpreted(self, start: int, local_vars: List[Any], args: List[Any]) -> Any:
+        """Run a function call in the interpreter loop and return its value"""
+        # Returning to the end of the program stops the nested loop
+        frame = {
+            'return_address': len(self._program),
+            'result_slot': None,
+            'caller_vars': self.variables,
+            'scope': self.scopes[start],
+            'locals': local_vars,
+            'return_value': None
+        }
+        self._args_stack.append(args)
+        self.call_stack.append(frame)
+        self.variables = local_vars
         
-        elif instr.op == 'builtin_len':
-            # len(array) or len(string)
-            arg = self.get_value(instr.arg1)
-            if isinstance(arg, (list, str)):
-                self.variables[instr.result] = len(arg)
-            else:
-                raise RuntimeError(f"len() requires array or string")
-        
-        elif instr.op == 'builtin_random':
-            # random(min, max)
-            import random
-            min_val = self.get_value(instr.arg1)
-            max_val = self.get_value(instr.arg2)
-            self.variables[instr.result] = random.randint(int(min_val), int(max_val))
-        
-        elif instr.op == 'builtin_substr':
-            # substr(string, start, end)
-            string = self.get_value(instr.arg1)
-            start, end = instr.arg2
-            start_val = self.get_value(start)
-            end_val = self.get_value(end)
-            
-            if not isinstance(string, str):
-                raise RuntimeError(f"substr() requires string")
-            
-            self.variables[instr.result] = string[int(start_val):int(end_val)]
+        # Deeper calls stay in the interpreter, which does not use the Python stack
+        natives_enabled = self._natives_enabled
+        self._natives_enabled = False
+        try:
+            self._run(start)
+        finally:
+            self._natives_enabled = natives_enabled
+        return frame['return_value']
+
+    def call_function(self, name: str, args: List[Any], max_steps: int) -> Any:
+        """
+        Run a function on its own - it sees only its arguments - and return
+        its value. Raises RuntimeError if it runs more than max_steps
+        instructions
+        """
+        if name not in self.functions:
+            raise RuntimeError(f"Undefined function: {name}")
+        start = self.functions[name]
+        scope = self.scopes[start]
+    
+        local_vars = [UNSET] * len(scope.slots)
+        frame = {
+            'return_address': len(self._program),
+            'result_slot': None,
+            'caller_vars': self.variables,
+            'scope': scope,
+            'locals': local_vars,
+            'return_value': None
+        }
+        depth = len(self.call_stack)
+        args_depth = len(self._args_stack)
+        variables = self.variables
+        natives_enabled = self._natives_enabled
+        self._args_stack.append(list(args))
+        self.call_stack.append(frame)
+        self.variables = local_vars
+        self._natives_enabled = False
+    
+        steps = self._steps
+        n = len(steps)
+        pc = start
+        try:
+            for _ in range(max_steps):
+                if pc >= n:
+                    return frame['return_value']
+                handler, instr = steps[pc]
+                next_pc = handler(instr, pc)
+                pc = pc + 1 if next_pc is None else next_pc
+            raise RuntimeError(f"Call to {name} exceeded {max_steps} steps")
+        finally:
+            # A failed call leaves its frames behind
+            del self.call_stack[depth:]
+            del self._args_stack[args_depth:]
+            self.variables = variables
+            self._natives_enabled = natives_enabled
+    
+    def _visible_value(self, slot: int) -> Any:
+        """Get the value the running code sees for a global slot"""
+        for frame in reversed(self.call_stack):
+            local = frame['scope'].local_of.get(slot)
+            if local is not None:
+                return frame['locals'][local]
+        return self.globals[slot]
+    
+    def _op_return(self, instr: Instruction, pc: int):
+        # Return from function
+        if not self.call_stack:
+            # Return from main program
+            return len(self.code)
         
-        elif instr.op == 'builtin_concat':
-            # concat(string1, string2)
-            str1 = self.get_value(instr.arg1)
-            str2 = self.get_value(instr.arg2)
-            
-            if not isinstance(str1, str) or not isinstance(str2, str):
-                raise RuntimeError(f"concat() requires string arguments")
-            
-            self.variables[instr.result] = str1 + str2
+        return_value = None
+        if instr.arg1 is not None:
+            return_value = self._v(instr.a1)
         
-        elif instr.op == 'builtin_input':
-            # input(prompt)
-            prompt = self.get_value(instr.arg1)
-            
-            if not isinstance(prompt, str):
-                raise RuntimeError(f"input() prompt must be string")
-            
-            try:
-                user_input = input(prompt)
-                self.variables[instr.result] = user_input
-            except EOFError:
-                self.variables[instr.result] = ""
+        # Pop call frame
+        frame = self.call_stack.pop()
+        self._args_stack.pop()
+        frame['return_value'] = return_value
+        
+        # Back to the caller's variables
+        self.variables = frame['caller_vars']
+        
+        # Store return value in the call's result variable
+        if return_value is not None and frame['result_slot'] is not None:
+            self.variables[frame['result_slot']] = return_value
+        
+        # Jump back
+        return frame['return_address']
     
-    def get_value(self, operand) -> Any:
-        """Get the value of an operand (variable or constant)"""
+    def _op_begin_func(self, instr: Instruction, pc: int):
+        # Function begin marker - skip to end
+        return self._targets[pc]
+    
+    def _op_array_init_list(self, instr: Instruction, pc: int):
+        # Array literal built from its element values
+        self.variables[instr.r] = [self._v(element) for element in instr.a1[1]]
+    
+    def _op_array_get(self, instr: Instruction, pc: int):
+        # Get array element: result = array[index]
+        array = self._v(instr.a1)
+        index = self._v(instr.a2)
+        
+        if type(array) is not list:
+            raise RuntimeError(f"Cannot index non-array type")
+        if type(index) not in INT_TYPES:
+            raise RuntimeError(f"Array index must be integer")
+        if index < 0 or index >= len(array):
+            raise RuntimeError(f"Array index out of bounds: {index}")
+        
+        self.variables[instr.r] = array[index]
+    
+    def _op_array_set(self, instr: Instruction, pc: int):
+        # Set array element: array[index] = value
+        array = self.variables[instr.r]
+        if type(array) is not list:
+            raise RuntimeError(f"Cannot index non-array type")
+        
+        index = self._v(instr.a1)
+        value = self._v(instr.a2)
+        
+        if type(index) not in INT_TYPES:
+            raise RuntimeError(f"Array index must be integer")
+        if index < 0 or index >= len(array):
+            raise RuntimeError(f"Array index out of bounds: {index}")
+        
+        array[index] = value
+    
+    def _op_builtin_len(self, instr: Instruction, pc: int):
+        # len(array) or len(string)
+        arg = self._v(instr.a1)
+        arg_type = type(arg)
+        if arg_type is list or arg_type is str:
+            self.variables[instr.r] = len(arg)
+        else:
+            raise RuntimeError(f"len() requires array or string")
+    
+    def _op_builtin_random(self, instr: Instruction, pc: int):
+        # random(min, max)
+        import random
+        min_val = self._v(instr.a1)
+        max_val = self._v(instr.a2)
+        self.variables[instr.r] = random.randint(int(min_val), int(max_val))
+    
+    def _op_builtin_substr(self, instr: Instruction, pc: int):
+        # substr(string, start, end)
+        string = self._v(instr.a1)
+        start, end = self._v(instr.a2)
+        start_val = self._v(start)
+        end_val = self._v(end)
+        
+        if type(string) is not str:
+            raise RuntimeError(f"substr() requires string")
+        
+        self.variables[instr.r] = string[int(start_val):int(end_val)]
+    
+    def _op_builtin_concat(self, instr: Instruction, pc: int):
+        # concat(string1, string2)
+        str1 = self._v(instr.a1)
+        str2 = self._v(instr.a2)
+        
+        if type(str1) is not str or type(str2) is not str:
+            raise RuntimeError(f"concat() requires string arguments")
+        
+        self.variables[instr.r] = str1 + str2
+    
+    def _op_builtin_input(self, instr: Instruction, pc: int):
+        # input(prompt)
+        prompt = self._v(instr.a1)
+        
+        if type(prompt) is not str:
+            raise RuntimeError(f"input() prompt must be string")
+        
+        # Earlier output must appear before the prompt
+        self._flush_output()
+        try:
+            self.variables[instr.r] = input(prompt)
+        except EOFError:
+            self.variables[instr.r] = ""
+    
+    @staticmethod
+    def resolve_operand(operand) -> Operand:
+        """Classify an operand once as a constant or a variable reference"""
         if operand is None:
-            return None
+            return (CONST, None)
+        
+        if operand.__class__ is StringLiteral:
+            return (CONST, operand.text)
         
         # Check if it's a boolean
         if operand is True or operand is False:
-            return operand
+            return (CONST, operand)
         
         # Check if it's already a number
         if isinstance(operand, (int, float)):
-            return operand
+            return (CONST, operand)
         
         # String literal
         if isinstance(operand, str):
             if operand.startswith('"') and operand.endswith('"'):
-                return operand[1:-1]
+                return (CONST, operand[1:-1])
             
             # Try to parse as number
             try:
                 if '.' in operand:
-                    return float(operand)
-                return int(operand)
+                    return (CONST, float(operand))
+                return (CONST, int(operand))
             except ValueError:
                 pass
             
             # Boolean literals
             if operand == 'true':
-                return True
+                return (CONST, True)
             elif operand == 'false':
-                return False
+                return (CONST, False)
             
             # Must be a variable
-            if operand not in self.variables:
-                raise RuntimeError(f"Undefined variable: {operand}")
-            return self.variables[operand]
+            return (VAR, operand)
         
-        return operand
+        return (CONST, operand)
+    
+    def _slot(self, name: str) -> int:
+        """Get the variable slot for a name, allocating one if needed"""
+        slot = self._slot_of.get(name)
+        if slot is None:
+            slot = self._slot_of[name] = len(self._slot_of)
+        return slot
+    
+    def _resolve(self, operand) -> Operand:
+        """Resolve an operand, mapping variable names to their slots"""
+        # The same names and literals recur throughout the code, so each
+        # distinct string is only parsed once
+        if operand.__class__ is str:
+            resolved = self._operand_cache.get(operand)
+            if resolved is None:
+                resolved = self._operand_cache[operand] = self._resolve_uncached(operand)
+            return resolved
+        return self._resolve_uncached(operand)
+    
+    def _resolve_uncached(self, operand) -> Operand:
+        kind, payload = self.resolve_operand(operand)
+        if kind is VAR:
+            return (VAR, self._slot(payload))
+        return (kind, payload)
+    
+    def _decode(self, instr: ThreeAddressCode) -> 'Instruction':
+        """Resolve the operands of an instruction for execution"""
+        op = instr.op
+        if op in FUNCTION_OPS:
+            a1 = (CONST, instr.arg1)
+        elif instr.arg1.__class__ is tuple:
+            # Array literals carry their element operands
+            a1 = (CONST, tuple(self._resolve(arg) for arg in instr.arg1))
+        else:
+            a1 = self._resolve(instr.arg1)
+        
+        arg2 = instr.arg2
+        if isinstance(arg2, tuple):
+            # substr carries its (start, end) operands as a pair
+            a2 = (CONST, tuple(self._resolve(arg) for arg in arg2))
+        else:
+            a2 = self._resolve(arg2)
+        
+        if op == 'param_decl':
+            # The declared parameter is the variable written
+            r = self._slot(instr.arg1)
+        elif instr.result is None or op in LABEL_OPS:
+            r = None
+        else:
+            r = self._slot(instr.result)
+        return Instruction(instr, a1, a2, r)
+    
+    def _v(self, operand: Operand) -> Any:
+        """Get the value of a resolved operand"""
+        kind, payload = operand
+        if kind is CONST:
+            return payload
+        value = self.variables[payload]
+        if value is UNSET:
+            raise RuntimeError(f"Undefined variable: {self._slot_name(payload)}")
+        return value
+    
+    def _slot_name(self, slot: int) -> str:
+        """Get the variable name for a slot (for error messages)"""
+        if self.call_stack:
+            slot = self.call_stack[-1]['scope'].slots[slot]
+        for name, index in self._slot_of.items():
+            if index == slot:
+                return name
+        return str(slot)
+    
+    def get_value(self, operand) -> Any:
+        """Get the value of an operand (variable or constant)"""
+        operand = self._resolve(operand)
+        self._grow_variables()
+        return self._v(operand)
+    
+    def _grow_variables(self):
+        """Make room for slots allocated after the program was loaded"""
+        missing = len(self._slot_of) - len(self.variables)
+        if missing > 0:
+            self.variables.extend([UNSET] * missing)
     
     def find_label(self, label: str) -> int:
         """Find the index of a label"""
-        for i, instr in enumerate(self.code):
-            if instr.op == 'label' and instr.result == label:
-                return i
-        raise RuntimeError(f"Label not found: {label}")
-    
-    def find_function_end(self, func_name: str) -> int:
-        """Find the end of a function - returns index after end_func"""
-        start = self.pc
-        depth = 0
-        for i in range(start, len(self.code)):
-            if self.code[i].op == 'begin_func':
-                depth += 1
-            elif self.code[i].op == 'end_func':
-                depth -= 1
-                if depth == 0:
-                    return i + 1  # Return position AFTER end_func
-        return len(self.code)
+        if label not in self.labels:
+            raise RuntimeError(f"Label not found: {label}")
+        return self.labels[label]
     
     def get_output(self) -> str:
         """Get captured output as string"""
@@ -421,7 +1006,7 @@ def test_interpreter():
     ir_gen = IRGenerator()
     ir_gen.generate(ast)
     
-    optimizer = Optimizer(ir_gen.code)
+    optimizer = Optimizer(ir_gen.code, ir_gen.temps)
     optimized_code = optimizer.optimize()
     
     print("\n=== Optimized IR ===")
@@ -5,12 +5,38 @@ Three-address code format: result = operand1 operator operand2
 """
 
 from parser import *
-from typing import List, Optional
+from typing import Callable, Dict, List, Optional, Set
+import sys
+
+
+# Operators that can fail at run time. Hoisting one out of a loop condition
+# would raise before the parts of the condition evaluated ahead of it
+FAILING_OPERATORS = frozenset(['/', '%', '**'])
+
+
+class StringLiteral:
+    """A string constant operand in three-address code"""
+    
+    __slots__ = ('text',)
+    
+    def __init__(self, text: str):
+        self.text = text
+    
+    def __eq__(self, other):
+        return other.__class__ is StringLiteral and other.text == self.text
+    
+    def __hash__(self):
+        return hash((StringLiteral, self.text))
+    
+    def __repr__(self):
+        return f'"{self.text}"'
 
 
 class ThreeAddressCode:
     """Represents a single three-address code instruction"""
     
+    __slots__ = ('op', 'arg1', 'arg2', 'result')
+    
     def __init__(self, op: str, arg1=None, arg2=None, result=None):
         self.op = op  # Operation: +, -, *, /, assign, call, etc.
         self.arg1 = arg1  # First operand
@@ -18,40 +44,46 @@ class ThreeAddressCode:
         self.result = result  # Result variable
     
     def __repr__(self):
-        if self.op == 'assign':
-            return f"{self.result} = {self.arg1}"
-        elif self.op == 'label':
-            return f"{self.result}:"
-        elif self.op == 'goto':
-            return f"goto {self.result}"
-        elif self.op == 'if_false':
-            return f"if_false {self.arg1} goto {self.result}"
-        elif self.op == 'if_true':
-            return f"if_true {self.arg1} goto {self.result}"
-        elif self.op == 'param':
-            return f"param {self.arg1}"
-        elif self.op == 'param_decl':
-            return f"param_decl {self.arg1}"
-        elif self.op == 'call':
-            if self.result:
-                return f"{self.result} = call {self.arg1}, {self.arg2}"
-            else:
-                return f"call {self.arg1}, {self.arg2}"
-        elif self.op == 'return':
-            if self.arg1:
-                return f"return {self.arg1}"
-            else:
-                return "return"
-        elif self.op == 'print':
-            return f"print {self.arg1}"
-        elif self.op == 'begin_func':
-            return f"begin_func {self.arg1}"
-        elif self.op == 'end_func':
-            return f"end_func {self.arg1}"
-        elif self.arg2 is not None:
-            return f"{self.result} = {self.arg1} {self.op} {self.arg2}"
-        else:
-            return f"{self.result} = {self.op} {self.arg1}"
+        return REPR_FORMATS.get(self.op, format_operation)(self)
+
+
+def format_operation(instr: ThreeAddressCode) -> str:
+    """Format a binary or unary operation"""
+    if instr.arg2 is not None:
+        return f"{instr.result} = {instr.arg1} {instr.op} {instr.arg2}"
+    return f"{instr.result} = {instr.op} {instr.arg1}"
+
+
+# Op -> formatter for instructions not shown as an operation
+REPR_FORMATS: Dict[str, Callable[[ThreeAddressCode], str]] = {
+    'assign': lambda instr: f"{instr.result} = {instr.arg1}",
+    'label': lambda instr: f"{instr.result}:",
+    'goto': lambda instr: f"goto {instr.result}",
+    'if_false': lambda instr: f"if_false {instr.arg1} goto {instr.result}",
+    'if_true': lambda instr: f"if_true {instr.arg1} goto {instr.result}",
+    'param': lambda instr: f"param {instr.arg1}",
+    'param_decl': lambda instr: f"param_decl {instr.arg1}",
+    'call': lambda instr: (f"{instr.result} = call {instr.arg1}, {instr.arg2}" if instr.result
+                           else f"call {instr.arg1}, {instr.arg2}"),
+    'return': lambda instr: f"return {instr.arg1}" if instr.arg1 else "return",
+    'print': lambda instr: f"print {instr.arg1}",
+    'begin_func': lambda instr: f"begin_func {instr.arg1}",
+    'end_func': lambda instr: f"end_func {instr.arg1}",
+    'array_init_list': lambda instr: f"{instr.result} = [{', '.join(str(elem) for elem in instr.arg1)}]",
+}
+
+
+# Interned temporary and label names by number, shared by every generator
+# since each compile numbers them from 0 again
+TEMP_NAMES: List[str] = []
+LABEL_NAMES: List[str] = []
+
+
+def pooled_name(pool: List[str], prefix: str, index: int) -> str:
+    """Get the name with a number from a pool, growing the pool as needed"""
+    while len(pool) <= index:
+        pool.append(sys.intern(f"{prefix}{len(pool)}"))
+    return pool[index]
 
 
 class IRGenerator:
@@ -60,17 +92,44 @@ class IRGenerator:
     def __init__(self):
         self.code: List[ThreeAddressCode] = []
         self.temp_count = 0
+        self.temps: Set[str] = set()  # Names issued by new_temp, as opposed to user variables
         self.label_count = 0
+        self._code_string: Optional[str] = None  # Listing of the code, once built
+        self._listed_count = 0  # Instructions in that listing
+        
+        # Node class -> generation method, so dispatch is one dict lookup
+        self._dispatch: Dict[type, Callable[[ASTNode], Optional[str]]] = {
+            Program: self.generate_Program,
+            VarDeclaration: self.generate_VarDeclaration,
+            Assignment: self.generate_Assignment,
+            BinaryOp: self.generate_BinaryOp,
+            UnaryOp: self.generate_UnaryOp,
+            Literal: self.generate_Literal,
+            Identifier: self.generate_Identifier,
+            IfStatement: self.generate_IfStatement,
+            WhileStatement: self.generate_WhileStatement,
+            ForStatement: self.generate_ForStatement,
+            FunctionDef: self.generate_FunctionDef,
+            FunctionCall: self.generate_FunctionCall,
+            ReturnStatement: self.generate_ReturnStatement,
+            PrintStatement: self.generate_PrintStatement,
+            Block: self.generate_Block,
+            ArrayLiteral: self.generate_ArrayLiteral,
+            ArrayAccess: self.generate_ArrayAccess,
+            ArrayAssignment: self.generate_ArrayAssignment,
+            BuiltInCall: self.generate_BuiltInCall,
+        }
     
     def new_temp(self) -> str:
         """Generate a new temporary variable"""
-        temp = f"t{self.temp_count}"
+        temp = pooled_name(TEMP_NAMES, 't', self.temp_count)
         self.temp_count += 1
+        self.temps.add(temp)
         return temp
     
     def new_label(self) -> str:
         """Generate a new label"""
-        label = f"L{self.label_count}"
+        label = pooled_name(LABEL_NAMES, 'L', self.label_count)
         self.label_count += 1
         return label
     
@@ -85,13 +144,10 @@ class IRGenerator:
         Generate IR for a node
         Returns the name of the variable/temp holding the result
         """
-        method_name = f'generate_{node.__class__.__name__}'
-        method = getattr(self, method_name, None)
-        
-        if method:
-            return method(node)
-        else:
+        method = self._dispatch.get(type(node))
+        if method is None:
             raise NotImplementedError(f"No IR generation method for {node.__class__.__name__}")
+        return method(node)
     
     # ============= IR Generation Methods =============
     
@@ -113,10 +169,38 @@ class IRGenerator:
     
     def generate_BinaryOp(self, node: BinaryOp) -> str:
         """Generate IR for binary operation"""
+        if node.operator in ('and', 'or'):
+            return self.generate_short_circuit(node)
+        
+        # Chains such as a + b + c nest to the left - walking down the chain
+        # instead of recursing keeps long expressions within the recursion limit
+        chain = [node]
+        first = node.left
+        while type(first) is BinaryOp and first.operator not in ('and', 'or'):
+            chain.append(first)
+            first = first.left
+        
+        left = self.generate(first)
+        # The most frequent instruction skips the emit() wrapper
+        append = self.code.append
+        for op_node in reversed(chain):
+            right = self.generate(op_node.right)
+            result = self.new_temp()
+            append(ThreeAddressCode(op_node.operator, left, right, result))
+            left = result
+        return left
+    
+    def generate_short_circuit(self, node: BinaryOp) -> str:
+        """Generate IR for and/or, evaluating the right side only when needed"""
+        # result = left; if it already decides the value, skip result = right
+        result = self.new_temp()
+        end_label = self.new_label()
         left = self.generate(node.left)
+        self.emit('assign', left, None, result)
+        self.emit('if_false' if node.operator == 'and' else 'if_true', result, None, end_label)
         right = self.generate(node.right)
-        result = self.new_temp()
-        self.emit(node.operator, left, right, result)
+        self.emit('assign', right, None, result)
+        self.emit('label', None, None, end_label)
         return result
     
     def generate_UnaryOp(self, node: UnaryOp) -> str:
@@ -126,13 +210,14 @@ class IRGenerator:
         self.emit(node.operator, operand, None, result)
         return result
     
-    def generate_Literal(self, node: Literal) -> str:
+    def generate_Literal(self, node: Literal):
         """Generate IR for literal (return value directly)"""
         if isinstance(node.value, str):
-            return f'"{node.value}"'
+            return StringLiteral(node.value)
         if isinstance(node.value, bool):
             return 'true' if node.value else 'false'
-        return str(node.value)
+        # Repeated literals share one string, like names and temporaries
+        return sys.intern(str(node.value))
     
     def generate_Identifier(self, node: Identifier) -> str:
         """Generate IR for identifier (return name)"""
@@ -154,8 +239,9 @@ class IRGenerator:
         for stmt in node.then_block:
             self.generate(stmt)
         
-        # Jump to end after then block
-        if node.else_block:
+        # Jump to end after then block, unless it never falls through
+        jumps_to_end = bool(node.else_block) and self.code[-1].op not in ('return', 'goto')
+        if jumps_to_end:
             self.emit('goto', None, None, end_label)
         
         # False label
@@ -165,50 +251,30 @@ class IRGenerator:
         if node.else_block:
             for stmt in node.else_block:
                 self.generate(stmt)
-            self.emit('label', None, None, end_label)
+            if jumps_to_end:
+                self.emit('label', None, None, end_label)
     
     def generate_WhileStatement(self, node: WhileStatement) -> None:
         """Generate IR for while loop"""
-        # Create labels
-        start_label = self.new_label()
-        end_label = self.new_label()
+        condition = self.hoist_invariants(node.condition, node.body)
         
-        # Start label
-        self.emit('label', None, None, start_label)
-        
-        # Generate condition
-        cond = self.generate(node.condition)
-        
-        # If condition is false, exit loop
-        self.emit('if_false', cond, None, end_label)
+        # The condition is tested at the bottom, so each iteration takes one
+        # branch instead of a test and a jump back
+        body_label, cond_label = self.emit_loop_entry()
         
         # Generate body
         for stmt in node.body:
             self.generate(stmt)
         
-        # Jump back to start
-        self.emit('goto', None, None, start_label)
-        
-        # End label
-        self.emit('label', None, None, end_label)
+        self.emit_loop_test(condition, body_label, cond_label)
     
     def generate_ForStatement(self, node: ForStatement) -> None:
         """Generate IR for for loop"""
         # Generate initialization
         self.generate(node.init)
         
-        # Create labels
-        start_label = self.new_label()
-        end_label = self.new_label()
-        
-        # Start label
-        self.emit('label', None, None, start_label)
-        
-        # Generate condition
-        cond = self.generate(node.condition)
-        
-        # If condition is false, exit loop
-        self.emit('if_false', cond, None, end_label)
+        condition = self.hoist_invariants(node.condition, node.body + [node.update])
+        body_label, cond_label = self.emit_loop_entry()
         
         # Generate body
         for stmt in node.body:
@@ -217,11 +283,84 @@ class IRGenerator:
         # Generate update
         self.generate(node.update)
         
-        # Jump back to start
-        self.emit('goto', None, None, start_label)
-        
-        # End label
-        self.emit('label', None, None, end_label)
+        self.emit_loop_test(condition, body_label, cond_label)
+    
+    def hoist_invariants(self, condition: ASTNode, body: List[ASTNode]) -> ASTNode:
+        """
+        Generate the operations of a loop condition that the loop cannot
+        change once, before the loop
+        Returns the condition with those operations replaced by their results
+        """
+        if not isinstance(condition, (BinaryOp, UnaryOp)):
+            return condition
+        assigned = set()
+        self.collect_assigned(body, assigned)
+        return self.hoist_operations(condition, assigned)
+    
+    def hoist_operations(self, node: ASTNode, assigned: set) -> ASTNode:
+        """Hoist the invariant operations of an expression that is always evaluated"""
+        if not isinstance(node, (BinaryOp, UnaryOp)):
+            return node
+        if self.is_invariant(node, assigned):
+            return Identifier(node.line, node.column, self.generate(node))
+        if isinstance(node, UnaryOp):
+            operand = self.hoist_operations(node.operand, assigned)
+            if operand is node.operand:
+                return node
+            return UnaryOp(node.line, node.column, node.operator, operand)
+        left = self.hoist_operations(node.left, assigned)
+        # The right side of and/or may not be evaluated at all
+        right = node.right if node.operator in ('and', 'or') else self.hoist_operations(node.right, assigned)
+        if left is node.left and right is node.right:
+            return node
+        return BinaryOp(node.line, node.column, left, node.operator, right)
+    
+    def is_invariant(self, node: ASTNode, assigned: set) -> bool:
+        """Check if an expression cannot fail, has no side effects and reads no assigned variable"""
+        if isinstance(node, Literal):
+            return True
+        if isinstance(node, Identifier):
+            return node.name not in assigned
+        if isinstance(node, BinaryOp):
+            if node.operator in FAILING_OPERATORS:
+                return False
+            return self.is_invariant(node.left, assigned) and self.is_invariant(node.right, assigned)
+        if isinstance(node, UnaryOp):
+            return self.is_invariant(node.operand, assigned)
+        # Calls, builtins and array reads stay in the loop
+        return False
+    
+    def collect_assigned(self, statements: List[ASTNode], assigned: set):
+        """Add the variables a list of statements may assign to assigned"""
+        # Expressions never assign, so only statements are walked
+        for stmt in statements:
+            if isinstance(stmt, (Assignment, VarDeclaration)):
+                assigned.add(stmt.name)
+            elif isinstance(stmt, ArrayAssignment):
+                assigned.add(stmt.array)
+            elif isinstance(stmt, IfStatement):
+                self.collect_assigned(stmt.then_block, assigned)
+                self.collect_assigned(stmt.else_block or [], assigned)
+            elif isinstance(stmt, WhileStatement):
+                self.collect_assigned(stmt.body, assigned)
+            elif isinstance(stmt, ForStatement):
+                self.collect_assigned([stmt.init, stmt.update] + stmt.body, assigned)
+            elif isinstance(stmt, Block):
+                self.collect_assigned(stmt.statements, assigned)
+    
+    def emit_loop_entry(self):
+        """Jump to the condition of a loop and start its body"""
+        body_label = self.new_label()
+        cond_label = self.new_label()
+        self.emit('goto', None, None, cond_label)
+        self.emit('label', None, None, body_label)
+        return body_label, cond_label
+    
+    def emit_loop_test(self, condition: ASTNode, body_label: str, cond_label: str):
+        """Generate the condition of a loop, repeating the body while it holds"""
+        self.emit('label', None, None, cond_label)
+        cond = self.generate(condition)
+        self.emit('if_true', cond, None, body_label)
     
     def generate_FunctionDef(self, node: FunctionDef) -> None:
         """Generate IR for function definition"""
@@ -229,8 +368,8 @@ class IRGenerator:
         self.emit('begin_func', node.name, None, None)
         
         # Emit parameter setup - store parameter names for the interpreter
-        for param_type, param_name in node.parameters:
-            self.emit('param_decl', param_name, None, None)
+        self.code.extend(ThreeAddressCode('param_decl', param_name, None, None)
+                         for param_type, param_name in node.parameters)
         
         # Generate body
         for stmt in node.body:
@@ -242,9 +381,10 @@ class IRGenerator:
     def generate_FunctionCall(self, node: FunctionCall) -> str:
         """Generate IR for function call"""
         # Push parameters
+        append = self.code.append
         for arg in node.arguments:
             arg_val = self.generate(arg)
-            self.emit('param', arg_val, None, None)
+            append(ThreeAddressCode('param', arg_val, None, None))
         
         # Call function
         result = self.new_temp()
@@ -261,9 +401,10 @@ class IRGenerator:
     
     def generate_PrintStatement(self, node: PrintStatement) -> None:
         """Generate IR for print statement"""
+        append = self.code.append
         for expr in node.expressions:
             value = self.generate(expr)
-            self.emit('print', value, None, None)
+            append(ThreeAddressCode('print', value, None, None))
     
     def generate_Block(self, node: Block) -> None:
         """Generate IR for block"""
@@ -272,15 +413,11 @@ class IRGenerator:
     
     def generate_ArrayLiteral(self, node: ArrayLiteral) -> str:
         """Generate IR for array literal"""
+        # Elements are evaluated first, then the array is built in one
+        # instruction - arg1 holds the element values
+        elements = tuple(self.generate(elem) for elem in node.elements)
         temp = self.new_temp()
-        # Emit array creation instruction - result field holds the temp variable
-        self.emit('array_init', None, None, temp)
-        
-        # Add each element - result field holds the array name, arg1 is the value
-        for i, elem in enumerate(node.elements):
-            elem_val = self.generate(elem)
-            self.emit('array_append', elem_val, None, temp)
-        
+        self.emit('array_init_list', elements, None, temp)
         return temp
     
     def generate_ArrayAccess(self, node: ArrayAccess) -> str:
@@ -301,7 +438,7 @@ class IRGenerator:
     
     def generate_BuiltInCall(self, node: BuiltInCall) -> str:
         """Generate IR for built-in function call"""
-        func = node.function.lower()
+        func = node.function
         temp = self.new_temp()
         
         if func == 'len':
@@ -332,7 +469,12 @@ class IRGenerator:
     
     def get_code_string(self) -> str:
         """Get string representation of generated code"""
-        return '\n'.join(str(instr) for instr in self.code)
+        # Code is only ever appended to, so a listing of as many
+        # instructions is still current
+        if self._code_string is None or self._listed_count != len(self.code):
+            self._code_string = '\n'.join(str(instr) for instr in self.code)
+            self._listed_count = len(self.code)
+        return self._code_string
 
 
 def test_ir_generator():
@@ -362,6 +504,24 @@ def test_ir_generator():
     print("=== Intermediate Code (Three-Address Code) ===")
     print(ir_gen.get_code_string())
 
+    # An operation that can fail stays in the loop condition, so the call
+    # ahead of it still runs before the division fails
+    regression_code = """
+    function int f(int n) {
+        print("called", n);
+        return n;
+    }
+    int i = 0;
+    while (f(i) < 3 / 0) {
+        i = i + 1;
+    }
+    """
+    ir_gen = IRGenerator()
+    ir_gen.generate(Parser(Lexer(regression_code).tokenize()).parse())
+    ops = [instr.op for instr in ir_gen.code]
+    assert ops.index('call') < ops.index('/'), "division hoisted ahead of the call"
+    print("\nLoop condition evaluated in order")
+
 
 if __name__ == "__main__":
     test_ir_generator()
@@ -0,0 +1,304 @@
+"""
+Function Compiler for NumCalc Language
+Phase 6 (fast path): Translates hot functions from three-address code into
+Python functions, so the interpreter can call them without dispatching
+every instruction
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+
+from interpreter import CONST, UNSET, INT_TYPES, Instruction, Interpreter, RuntimeError
+
+
+# Ops a compiled function may contain
+SUPPORTED_OPS = frozenset([
+    'assign', '+', '-', '*', '/', '%', '**',
+    '<', '>', '<=', '>=', '==', '!=', 'and', 'or', 'not',
+    'label', 'goto', 'if_false', 'if_true',
+    'param', 'param_decl', 'call', 'return', 'print', 'nop',
+])
+
+# Binary ops that translate directly to a Python operator
+PYTHON_OPS = frozenset(['+', '-', '*', '**', '<', '>', '<=', '>=', '==', '!=', 'and', 'or'])
+
+# Ops that end a basic block
+JUMP_OPS = frozenset(['goto', 'if_false', 'if_true', 'return'])
+
+
+class FunctionCompiler:
+    """Generates a Python function for one NumCalc function"""
+
+    def __init__(self, interpreter: Interpreter, start: int):
+        self.interpreter = interpreter
+        self.program: List[Instruction] = interpreter._program
+        self.targets: List[Optional[int]] = interpreter._targets
+        self.scope = interpreter.scopes[start]
+        self.start = start
+        self.end = interpreter._targets[start - 1] - 1  # Index of end_func
+        self.constants: Dict[str, Any] = {}
+        self.lines: List[str] = []
+
+    def is_supported(self) -> bool:
+        """Check that the function can be compiled without changing behavior"""
+        program = self.program
+        if self.end <= self.start or program[self.end].op != 'end_func':
+            return False
+        # Control must never fall through to end_func - the interpreter
+        # would carry on into the code after the function
+        if program[self.end - 1].op not in ('return', 'goto'):
+            return False
+
+        for pc in range(self.start, self.end):
+            instr = program[pc]
+            if instr.op not in SUPPORTED_OPS:
+                return False
+            if instr.op in ('goto', 'if_false', 'if_true'):
+                target = self.targets[pc]
+                if target is None or not self.start <= target < self.end:
+                    return False
+            # Only calls to the function itself - other callees would need
+            # the caller's full variable view
+            if instr.op == 'call' and self.interpreter.functions.get(instr.arg1) != self.start:
+                return False
+        return True
+
+    def compile(self) -> Callable[[List[Any], List[Any], int], Any]:
+        """Generate and build the Python function"""
+        leaders = self._find_leaders()
+        block_of = {pc: block for block, pc in enumerate(leaders)}
+
+        slots = len(self.scope.slots)
+        names = ', '.join(f'v{slot}' for slot in range(slots))
+        self._emit(1, 'def native(L, args, depth):')
+        if slots:
+            self._emit(2, f'{names}{"," if slots == 1 else ""} = L')
+        self._emit(2, 'block = 0')
+        self._emit(2, 'while True:')
+
+        for block, first in enumerate(leaders):
+            last = leaders[block + 1] if block + 1 < len(leaders) else self.end
+            keyword = 'if' if block == 0 else 'elif'
+            self._emit(3, f'{keyword} block == {block}:')
+            self._compile_block(first, last, block_of)
+
+        self._emit(1, 'return native')
+
+        namespace = self._namespace()
+        params = ', '.join(namespace)
+        source = f'def make({params}):\n' + '\n'.join(self.lines) + '\n'
+        exec(compile(source, f'<native {self.scope.name}>', 'exec'), namespace)
+        return namespace['make'](*(namespace[name] for name in params.split(', ')))
+
+    def _find_leaders(self) -> List[int]:
+        """Find the first instruction of each basic block"""
+        leaders = {self.start}
+        for pc in range(self.start, self.end):
+            instr = self.program[pc]
+            if instr.op == 'label':
+                leaders.add(pc)
+            if instr.op in JUMP_OPS and pc + 1 < self.end:
+                leaders.add(pc + 1)
+        return sorted(leaders)
+
+    def _compile_block(self, first: int, last: int, block_of: Dict[int, int]):
+        """Translate the instructions of one basic block"""
+        assigned = set()  # Slots written earlier in this block
+        ends_with_jump = False
+        emitted = False
+
+        for pc in range(first, last):
+            instr = self.program[pc]
+            op = instr.op
+            lines = self._compile_instr(instr, pc, assigned, block_of)
+            for line in lines:
+                self._emit(4, line)
+            emitted = emitted or bool(lines)
+            ends_with_jump = op in JUMP_OPS
+            # param_decl and call only assign conditionally
+            if instr.r is not None and op not in ('param_decl', 'call'):
+                assigned.add(instr.r)
+
+        if not ends_with_jump:
+            self._emit(4, f'block = {block_of[last]}')
+        elif not emitted:
+            self._emit(4, 'pass')
+
+    def _compile_instr(self, instr: Instruction, pc: int, assigned: set, block_of: Dict[int, int]) -> List[str]:
+        """Translate one instruction into lines of Python"""
+        op = instr.op
+
+        def value(operand):
+            return self._operand(operand, assigned)
+
+        result = f'v{instr.r}' if instr.r is not None else None
+
+        if op in ('label', 'param', 'nop'):
+            return []
+
+        if op == 'assign':
+            return [f'{result} = {value(instr.a1)}']
+
+        if op in PYTHON_OPS:
+            # Both operands are evaluated before the operator, as in the interpreter
+            return [
+                f'left = {value(instr.a1)}',
+                f'right = {value(instr.a2)}',
+                f'{result} = left {op} right',
+            ]
+
+        if op == '/':
+            lines = [
+                f'left = {value(instr.a1)}',
+                f'right = {value(instr.a2)}',
+                'if right == 0:',
+                '    raise RuntimeError("Division by zero")',
+            ]
+            handler = self.interpreter._dispatch[pc]
+            if handler == self.interpreter._op_idiv:
+                lines.append(f'{result} = left // right')
+            elif handler == self.interpreter._op_fdiv:
+                lines.append(f'{result} = left / right')
+            else:
+                lines.append(f'{result} = left // right if type(left) in INT_TYPES and type(right) in INT_TYPES else left / right')
+            return lines
+
+        if op == '%':
+            return [
+                f'left = {value(instr.a1)}',
+                f'right = {value(instr.a2)}',
+                'if right == 0:',
+                '    raise RuntimeError("Modulo by zero")',
+                f'{result} = left % right',
+            ]
+
+        if op == 'not':
+            return [f'{result} = not {value(instr.a1)}']
+
+        if op == 'goto':
+            return [f'block = {block_of[self.targets[pc]]}']
+
+        if op in ('if_false', 'if_true'):
+            test = 'not ' if op == 'if_false' else ''
+            return [
+                f'if {test}{value(instr.a1)}:',
+                f'    block = {block_of[self.targets[pc]]}',
+                'else:',
+                f'    block = {block_of[pc + 1]}',
+            ]
+
+        if op == 'param_decl':
+            return [
+                f'if {instr.param_idx} < len(args):',
+                f'    {result} = args[{instr.param_idx}]',
+            ]
+
+        if op == 'call':
+            # The callee is this function, so it sees exactly our variables
+            slots = len(self.scope.slots)
+            local_vars = ', '.join(f'v{slot}' for slot in range(slots))
+            args = ', '.join(value(param) for param in instr.params)
+            lines = [f'returned = call([{local_vars}], [{args}], depth + 1)']
+            if result is not None:
+                lines += ['if returned is not None:', f'    {result} = returned']
+            return lines
+
+        if op == 'return':
+            if instr.arg1 is None:
+                return ['return None']
+            return [f'return {value(instr.a1)}']
+
+        # is_supported only admits SUPPORTED_OPS, and print is the last of them
+        assert op == 'print', f"Cannot compile op {op}"
+        return [f'output({value(instr.a1)})']
+
+    def _operand(self, operand, assigned: set) -> str:
+        """Python expression for an operand"""
+        kind, payload = operand
+        if kind is CONST:
+            name = f'c{len(self.constants)}'
+            self.constants[name] = payload
+            return name
+        if payload in assigned:
+            return f'v{payload}'
+        # May still be unassigned (e.g. not visible to the caller)
+        return f'(v{payload} if v{payload} is not UNSET else undefined({payload}))'
+
+    def _namespace(self) -> Dict[str, Any]:
+        """Names the generated function closes over"""
+        interpreter = self.interpreter
+        scope = self.scope
+        start = self.start
+        native_call = interpreter._native_call
+
+        def undefined(slot):
+            raise RuntimeError(f"Undefined variable: {scope_name(slot)}")
+
+        def scope_name(slot):
+            global_slot = scope.slots[slot]
+            for name, index in interpreter._slot_of.items():
+                if index == global_slot:
+                    return name
+            return str(slot)
+
+        def call(local_vars, args, depth):
+            return native_call(start, local_vars, args, depth)
+
+        namespace = {
+            'UNSET': UNSET,
+            'INT_TYPES': INT_TYPES,
+            'RuntimeError': RuntimeError,
+            'undefined': undefined,
+            'call': call,
+            'output': interpreter._print_value,
+        }
+        namespace.update(self.constants)
+        return namespace
+
+    def _emit(self, indent: int, line: str):
+        for part in line.split('\n'):
+            self.lines.append('    ' * indent + part)
+
+
+def compile_function(interpreter: Interpreter, start: int) -> Optional[Callable]:
+    """Compile the function starting at pc start, or return None if unsupported"""
+    compiler = FunctionCompiler(interpreter, start)
+    if not compiler.is_supported():
+        return None
+    return compiler.compile()
+
+
+def test_jit():
+    """Test the function compiler"""
+    from lexer import Lexer
+    from parser import Parser
+    from ir_generator import IRGenerator
+
+    test_code = """
+    function int fibonacci(int n) {
+        if (n <= 1) {
+            return n;
+        }
+        return fibonacci(n - 1) + fibonacci(n - 2);
+    }
+
+    print(fibonacci(20));
+    """
+
+    ir_gen = IRGenerator()
+    ir_gen.generate(Parser(Lexer(test_code).tokenize()).parse())
+
+    interpreter = Interpreter(ir_gen.code)
+    compiler = FunctionCompiler(interpreter, interpreter.functions['fibonacci'])
+    print("=== Supported ===")
+    print(compiler.is_supported())
+    compiler.compile()
+    print("\n=== Generated Code ===")
+    print('\n'.join(compiler.lines))
+
+    print("\n=== Program Output ===")
+    interpreter.execute()
+    print()
+
+
+if __name__ == "__main__":
+    test_jit()
@@ -4,9 +4,11 @@ Phase 1: Converts source code into tokens
 """
 
 import re
+import sys
+from bisect import bisect_left
 from enum import Enum, auto
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 
 class TokenType(Enum):
@@ -70,11 +72,18 @@ class TokenType(Enum):
     # Special
     EOF = auto()
     NEWLINE = auto()
+    
+    # Members are singletons compared by identity, so the identity hash is
+    # consistent with equality and avoids Enum's Python-level __hash__ on
+    # every table lookup
+    __hash__ = object.__hash__
 
 
 @dataclass
 class Token:
     """Represents a single token"""
+    __slots__ = ('type', 'value', 'line', 'column')
+    
     type: TokenType
     value: any
     line: int
@@ -84,295 +93,185 @@ class Token:
         return f"Token({self.type.name}, {repr(self.value)}, {self.line}:{self.column})"
 
 
+# Master pattern: the first alternative that matches decides the token class
+TOKEN_RE = re.compile(r'''
+    (?P<WS>[ \t\r\n]+)
+  | (?P<COMMENT>//[^\n]*|/\*.*?\*/)
+  | (?P<NUMBER>\d[\d.]*)
+  | (?P<STRING>"(?:\\.|[^"\\])*")
+  | (?P<ID>[^\W\d]\w*)
+  | (?P<UNTERMINATED_COMMENT>/\*)
+  | (?P<UNTERMINATED_STRING>")
+  | (?P<OP>\*\*|==|!=|<=|>=|[-+*/%=<>(){}\[\];,:])
+  | (?P<ERROR>.)
+''', re.VERBOSE | re.DOTALL)
+
+# Escape sequences inside string literals (any other escaped character is kept as is)
+ESCAPE_RE = re.compile(r'\\(.)', re.DOTALL)
+ESCAPES = {'n': '\n', 't': '\t'}
+
+# Keywords mapping
+KEYWORDS = {
+    'int': TokenType.INT,
+    'float': TokenType.FLOAT,
+    'bool': TokenType.BOOL,
+    'string': TokenType.STRING,
+    'if': TokenType.IF,
+    'else': TokenType.ELSE,
+    'while': TokenType.WHILE,
+    'for': TokenType.FOR,
+    'return': TokenType.RETURN,
+    'print': TokenType.PRINT,
+    'input': TokenType.INPUT,
+    'function': TokenType.FUNCTION,
+    'true': TokenType.TRUE,
+    'false': TokenType.FALSE,
+    'len': TokenType.LEN,
+    'random': TokenType.RANDOM,
+    'substr': TokenType.SUBSTR,
+    'concat': TokenType.CONCAT,
+    'and': TokenType.AND,
+    'or': TokenType.OR,
+    'not': TokenType.NOT,
+}
+
+# Operators and delimiters
+OPERATORS = {
+    '+': TokenType.PLUS,
+    '-': TokenType.MINUS,
+    '*': TokenType.MULTIPLY,
+    '**': TokenType.POWER,
+    '/': TokenType.DIVIDE,
+    '%': TokenType.MODULO,
+    '=': TokenType.ASSIGN,
+    '==': TokenType.EQ,
+    '!=': TokenType.NE,
+    '<': TokenType.LT,
+    '<=': TokenType.LE,
+    '>': TokenType.GT,
+    '>=': TokenType.GE,
+    '(': TokenType.LPAREN,
+    ')': TokenType.RPAREN,
+    '{': TokenType.LBRACE,
+    '}': TokenType.RBRACE,
+    '[': TokenType.LBRACKET,
+    ']': TokenType.RBRACKET,
+    ';': TokenType.SEMICOLON,
+    ',': TokenType.COMMA,
+    ':': TokenType.COLON,
+}
+
+
 class Lexer:
     """Lexical analyzer that converts source code into tokens"""
     
-    # Keywords mapping
-    KEYWORDS = {
-        'int': TokenType.INT,
-        'float': TokenType.FLOAT,
-        'bool': TokenType.BOOL,
-        'string': TokenType.STRING,
-        'if': TokenType.IF,
-        'else': TokenType.ELSE,
-        'while': TokenType.WHILE,
-        'for': TokenType.FOR,
-        'return': TokenType.RETURN,
-        'print': TokenType.PRINT,
-        'input': TokenType.INPUT,
-        'function': TokenType.FUNCTION,
-        'true': TokenType.TRUE,
-        'false': TokenType.FALSE,
-        'len': TokenType.LEN,
-        'random': TokenType.RANDOM,
-        'substr': TokenType.SUBSTR,
-        'concat': TokenType.CONCAT,
-        'function': TokenType.FUNCTION,
-        'and': TokenType.AND,
-        'or': TokenType.OR,
-        'not': TokenType.NOT,
-    }
+    # Kept for code that reads Lexer.KEYWORDS
+    KEYWORDS = KEYWORDS
     
     def __init__(self, source_code: str):
         self.source = source_code
         self.pos = 0
-        self.line = 1
-        self.column = 1
         self.tokens: List[Token] = []
         
-    def error(self, message: str):
-        """Raise a lexical error"""
-        raise SyntaxError(f"Lexical error at line {self.line}, column {self.column}: {message}")
-    
-    def peek(self, offset: int = 0) -> Optional[str]:
-        """Peek at character at current position + offset"""
-        pos = self.pos + offset
-        if pos < len(self.source):
-            return self.source[pos]
-        return None
+        # Offsets of every newline, so line/column are only computed when needed
+        self._newlines = [m.start() for m in re.finditer('\n', source_code)]
     
-    def advance(self) -> Optional[str]:
-        """Consume and return current character"""
-        if self.pos >= len(self.source):
-            return None
-        char = self.source[self.pos]
-        self.pos += 1
-        if char == '\n':
-            self.line += 1
-            self.column = 1
-        else:
-            self.column += 1
-        return char
+    def _loc(self, pos: int) -> Tuple[int, int]:
+        """Get the (line, column) of a source offset, both starting at 1"""
+        line = bisect_left(self._newlines, pos)
+        line_start = self._newlines[line - 1] + 1 if line else 0
+        return line + 1, pos - line_start + 1
     
-    def skip_whitespace(self):
-        """Skip whitespace characters"""
-        while self.peek() and self.peek() in ' \t\r\n':
-            self.advance()
+    @property
+    def line(self) -> int:
+        """Line of the current position"""
+        return self._loc(self.pos)[0]
     
-    def skip_single_line_comment(self):
-        """Skip single-line comment // ..."""
-        self.advance()  # /
-        self.advance()  # /
-        while self.peek() and self.peek() != '\n':
-            self.advance()
+    @property
+    def column(self) -> int:
+        """Column of the current position"""
+        return self._loc(self.pos)[1]
     
-    def skip_multi_line_comment(self):
-        """Skip multi-line comment /* ... */"""
-        self.advance()  # /
-        self.advance()  # *
-        while self.peek():
-            if self.peek() == '*' and self.peek(1) == '/':
-                self.advance()  # *
-                self.advance()  # /
-                return
-            self.advance()
-        self.error("Unterminated multi-line comment")
-    
-    def read_number(self) -> Token:
-        """Read integer or float literal"""
-        start_line = self.line
-        start_column = self.column
-        num_str = ''
-        is_float = False
-        
-        while self.peek() and (self.peek().isdigit() or self.peek() == '.'):
-            if self.peek() == '.':
-                if is_float:
-                    self.error("Invalid number format: multiple decimal points")
-                is_float = True
-            num_str += self.advance()
-        
-        if is_float:
-            return Token(TokenType.FLOAT_LITERAL, float(num_str), start_line, start_column)
-        else:
-            return Token(TokenType.INT_LITERAL, int(num_str), start_line, start_column)
-    
-    def read_string(self) -> Token:
-        """Read string literal"""
-        start_line = self.line
-        start_column = self.column
-        self.advance()  # opening "
-        string_value = ''
-        
-        while self.peek() and self.peek() != '"':
-            if self.peek() == '\\':
-                self.advance()
-                next_char = self.peek()
-                if next_char == 'n':
-                    string_value += '\n'
-                    self.advance()
-                elif next_char == 't':
-                    string_value += '\t'
-                    self.advance()
-                elif next_char == '\\':
-                    string_value += '\\'
-                    self.advance()
-                elif next_char == '"':
-                    string_value += '"'
-                    self.advance()
-                else:
-                    string_value += next_char
-                    self.advance()
-            else:
-                string_value += self.advance()
-        
-        if not self.peek():
-            self.error("Unterminated string literal")
-        
-        self.advance()  # closing "
-        return Token(TokenType.STRING_LITERAL, string_value, start_line, start_column)
-    
-    def read_identifier(self) -> Token:
-        """Read identifier or keyword"""
-        start_line = self.line
-        start_column = self.column
-        identifier = ''
-        
-        while self.peek() and (self.peek().isalnum() or self.peek() == '_'):
-            identifier += self.advance()
-        
-        # Check if it's a keyword
-        token_type = self.KEYWORDS.get(identifier, TokenType.IDENTIFIER)
-        
-        # Handle boolean literals
-        if token_type == TokenType.TRUE:
-            return Token(TokenType.BOOL_LITERAL, True, start_line, start_column)
-        elif token_type == TokenType.FALSE:
-            return Token(TokenType.BOOL_LITERAL, False, start_line, start_column)
-        
-        return Token(token_type, identifier, start_line, start_column)
+    def error(self, message: str):
+        """Raise a lexical error"""
+        line, column = self._loc(self.pos)
+        raise SyntaxError(f"Lexical error at line {line}, column {column}: {message}")
     
     def tokenize(self) -> List[Token]:
         """Convert source code into list of tokens"""
-        while self.pos < len(self.source):
-            self.skip_whitespace()
-            
-            if self.pos >= len(self.source):
-                break
+        source = self.source
+        tokens = self.tokens
+        newlines = self._newlines
+        row = 0  # Newlines before the current token
+        
+        for match in TOKEN_RE.finditer(source):
+            kind = match.lastgroup
+            if kind == 'WS' or kind == 'COMMENT':
+                continue
             
-            char = self.peek()
-            start_line = self.line
-            start_column = self.column
+            # Same as self._loc(start), inlined; tokens come in source order
+            # so the search can resume from the previous token's line
+            start = match.start()
+            row = bisect_left(newlines, start, row)
+            line = row + 1
+            column = start - newlines[row - 1] if row else start + 1
             
-            # Comments
-            if char == '/' and self.peek(1) == '/':
-                self.skip_single_line_comment()
-                continue
-            elif char == '/' and self.peek(1) == '*':
-                self.skip_multi_line_comment()
+            # Strings - slice the body straight out of the source
+            if kind == 'STRING':
+                value = source[start + 1:match.end() - 1]
+                if '\\' in value:
+                    # Only strings with escapes need rebuilding
+                    value = ESCAPE_RE.sub(lambda m: ESCAPES.get(m.group(1), m.group(1)), value)
+                tokens.append(Token(TokenType.STRING_LITERAL, value, line, column))
                 continue
             
-            # Numbers
-            elif char.isdigit():
-                self.tokens.append(self.read_number())
-            
-            # Strings
-            elif char == '"':
-                self.tokens.append(self.read_string())
+            # Names and operators are interned - every later stage keys dicts
+            # on them, and equal interned strings compare by identity
+            text = sys.intern(match.group())
             
             # Identifiers and keywords
-            elif char.isalpha() or char == '_':
-                self.tokens.append(self.read_identifier())
-            
-            # Operators and delimiters
-            elif char == '+':
-                self.advance()
-                self.tokens.append(Token(TokenType.PLUS, '+', start_line, start_column))
-            
-            elif char == '-':
-                self.advance()
-                self.tokens.append(Token(TokenType.MINUS, '-', start_line, start_column))
-            
-            elif char == '*':
-                self.advance()
-                if self.peek() == '*':
-                    self.advance()
-                    self.tokens.append(Token(TokenType.POWER, '**', start_line, start_column))
-                else:
-                    self.tokens.append(Token(TokenType.MULTIPLY, '*', start_line, start_column))
-            
-            elif char == '/':
-                self.advance()
-                self.tokens.append(Token(TokenType.DIVIDE, '/', start_line, start_column))
-            
-            elif char == '%':
-                self.advance()
-                self.tokens.append(Token(TokenType.MODULO, '%', start_line, start_column))
-            
-            elif char == '=':
-                self.advance()
-                if self.peek() == '=':
-                    self.advance()
-                    self.tokens.append(Token(TokenType.EQ, '==', start_line, start_column))
-                else:
-                    self.tokens.append(Token(TokenType.ASSIGN, '=', start_line, start_column))
-            
-            elif char == '!':
-                self.advance()
-                if self.peek() == '=':
-                    self.advance()
-                    self.tokens.append(Token(TokenType.NE, '!=', start_line, start_column))
+            if kind == 'ID':
+                token_type = KEYWORDS.get(text, TokenType.IDENTIFIER)
+                # Handle boolean literals
+                if token_type == TokenType.TRUE:
+                    tokens.append(Token(TokenType.BOOL_LITERAL, True, line, column))
+                elif token_type == TokenType.FALSE:
+                    tokens.append(Token(TokenType.BOOL_LITERAL, False, line, column))
                 else:
-                    self.error(f"Unexpected character: {char}")
+                    tokens.append(Token(token_type, text, line, column))
             
-            elif char == '<':
-                self.advance()
-                if self.peek() == '=':
-                    self.advance()
-                    self.tokens.append(Token(TokenType.LE, '<=', start_line, start_column))
-                else:
-                    self.tokens.append(Token(TokenType.LT, '<', start_line, start_column))
+            # Operators and delimiters
+            elif kind == 'OP':
+                tokens.append(Token(OPERATORS[text], text, line, column))
             
-            elif char == '>':
-                self.advance()
-                if self.peek() == '=':
-                    self.advance()
-                    self.tokens.append(Token(TokenType.GE, '>=', start_line, start_column))
+            # Numbers
+            elif kind == 'NUMBER':
+                if '.' in text:
+                    second_dot = text.find('.', text.index('.') + 1)
+                    if second_dot != -1:
+                        self.pos = start + second_dot
+                        self.error("Invalid number format: multiple decimal points")
+                    tokens.append(Token(TokenType.FLOAT_LITERAL, float(text), line, column))
                 else:
-                    self.tokens.append(Token(TokenType.GT, '>', start_line, start_column))
-            
-            elif char == '(':
-                self.advance()
-                self.tokens.append(Token(TokenType.LPAREN, '(', start_line, start_column))
-            
-            elif char == ')':
-                self.advance()
-                self.tokens.append(Token(TokenType.RPAREN, ')', start_line, start_column))
-            
-            elif char == '{':
-                self.advance()
-                self.tokens.append(Token(TokenType.LBRACE, '{', start_line, start_column))
-            
-            elif char == '}':
-                self.advance()
-                self.tokens.append(Token(TokenType.RBRACE, '}', start_line, start_column))
-            
-            elif char == '[':
-                self.advance()
-                self.tokens.append(Token(TokenType.LBRACKET, '[', start_line, start_column))
-            
-            elif char == ']':
-                self.advance()
-                self.tokens.append(Token(TokenType.RBRACKET, ']', start_line, start_column))
-            
-            elif char == ';':
-                self.advance()
-                self.tokens.append(Token(TokenType.SEMICOLON, ';', start_line, start_column))
+                    tokens.append(Token(TokenType.INT_LITERAL, int(text), line, column))
             
-            elif char == ',':
-                self.advance()
-                self.tokens.append(Token(TokenType.COMMA, ',', start_line, start_column))
+            elif kind == 'UNTERMINATED_STRING':
+                self.pos = len(source)
+                self.error("Unterminated string literal")
             
-            elif char == ':':
-                self.advance()
-                self.tokens.append(Token(TokenType.COLON, ':', start_line, start_column))
+            elif kind == 'UNTERMINATED_COMMENT':
+                self.pos = len(source)
+                self.error("Unterminated multi-line comment")
             
             else:
-                self.error(f"Unexpected character: {char}")
+                # A lone '!' is reported after it has been consumed
+                self.pos = start + 1 if text == '!' else start
+                self.error(f"Unexpected character: {text}")
         
         # Add EOF token
-        self.tokens.append(Token(TokenType.EOF, None, self.line, self.column))
-        return self.tokens
+        self.pos = len(source)
+        tokens.append(Token(TokenType.EOF, None, *self._loc(self.pos)))
+        return tokens
 
 
 def test_lexer():
@@ -4,267 +4,733 @@ Phase 5: Performs basic optimizations on intermediate code
 - Constant folding
 - Dead code elimination
 - Copy propagation
+- Compile-time evaluation of pure function calls
 """
 
-from ir_generator import ThreeAddressCode, IRGenerator
-from typing import List, Set, Dict
+from ir_generator import StringLiteral, ThreeAddressCode, IRGenerator
+from interpreter import INT_TYPES, Interpreter
+from typing import Any, Callable, List, Optional, Set, Dict, Tuple
+from itertools import chain
+import operator
+import re
+
+
+# Most optimization passes run before giving up on reaching a fixed point
+MAX_PASSES = 4
+
+# Ops that start or end basic blocks
+CONTROL_FLOW_OPS = frozenset(['label', 'goto', 'if_false', 'if_true'])
+
+# Ops whose arg1 names a function or parameter rather than a value
+NAME_OPS = frozenset(['call', 'begin_func', 'end_func', 'param_decl'])
+
+def divide(left, right):
+    """Divide as the interpreter does - integer division when both operands are integers"""
+    if left.__class__ in INT_TYPES and right.__class__ in INT_TYPES:
+        return left // right
+    return left / right
+
+
+# Binary ops folded when both operands are constant, with their evaluation
+FOLDABLE_OPS: Dict[str, Callable[[Any, Any], Any]] = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': divide,
+    '%': operator.mod,
+    '**': operator.pow,
+    '<': operator.lt,
+    '>': operator.gt,
+    '<=': operator.le,
+    '>=': operator.ge,
+    '==': operator.eq,
+    '!=': operator.ne,
+}
+
+# Right and left operands that leave the other operand unchanged. Arithmetic
+# operands are numeric after semantic analysis; x + 0 is left out as it turns
+# -0.0 into 0.0, and x * 0, x - x, x ** 0 as they differ for floats
+RIGHT_IDENTITIES = {'-': 0, '*': 1, '/': 1, '**': 1}
+LEFT_IDENTITIES = {'*': 1}
+
+# Binary ops copies are propagated into
+COPY_OPS = frozenset(FOLDABLE_OPS) | {'and', 'or'}
+
+# Ops whose result depends only on their operands
+PURE_OPS = COPY_OPS | {'not'}
+
+# Binary ops whose operands can be swapped
+COMMUTATIVE_OPS = frozenset(['+', '*', '==', '!='])
+
+# Numeric literal operands (identifiers such as "inf" or "nan" are not numbers)
+NUMBER_RE = re.compile(r'-?\d+(?P<fraction>\.\d+)?(?P<exponent>[eE][+-]?\d+)?\Z')
+
+# Ops a function may contain for calls to it to be evaluated at compile time
+# (besides calls to other such functions)
+PURE_FUNCTION_OPS = PURE_OPS | CONTROL_FLOW_OPS | {'assign', 'param', 'param_decl', 'call', 'return',
+                                                   'builtin_len', 'builtin_substr', 'builtin_concat'}
+
+# Most instructions a call evaluated at compile time may run
+MAX_FOLDED_CALL_STEPS = 10000
+
+# Ops that update the array named by their result in place
+ARRAY_UPDATE_OPS = frozenset(['array_set'])
+
+# Ops never removed by dead code elimination (input and random consume
+# input and random state even when their result is unused)
+SIDE_EFFECT_OPS = frozenset(['label', 'goto', 'if_false', 'if_true', 'begin_func', 'end_func',
+                             'print', 'return', 'call', 'param', 'param_decl',
+                             'builtin_input', 'builtin_random']) | ARRAY_UPDATE_OPS
 
 
 class Optimizer:
     """Performs optimizations on three-address code"""
     
-    def __init__(self, code: List[ThreeAddressCode]):
+    def __init__(self, code: List[ThreeAddressCode], temps: Optional[Set[str]] = None):
         self.code = code
+        # Temporaries issued by the IR generator - only assignments to these
+        # may be removed. Without them every assignment is kept
+        self.temps: Set[str] = temps if temps is not None else set()
         self.optimized_code: List[ThreeAddressCode] = []
+        self._literal_cache: Dict[str, Tuple[bool, Any]] = {}  # Operand string -> parsed literal
+        self.changed = False  # Whether the last pass rewrote or removed anything
+        self._pure_funcs: Set[str] = set()  # Functions calls may be evaluated at compile time
+        self._function_code: List[ThreeAddressCode] = []  # Code the pure functions are run from
+        self._evaluator: Optional[Interpreter] = None  # Runs pure calls, built when first needed
+        self._call_results: Dict[tuple, Tuple[bool, Any]] = {}  # (function, args) -> (folded, value)
     
     def optimize(self) -> List[ThreeAddressCode]:
         """Apply all optimizations"""
-        # Apply constant folding
-        self.code = self.constant_folding(self.code)
+        # Folding can expose copies and copies can expose folds, so repeat
+        # until a pass changes nothing
+        for _ in range(MAX_PASSES):
+            self.code = self.optimize_fused(self.code)
+            if not self.changed:
+                break
+        return self.code
+    
+    def optimize_fused(self, code: List[ThreeAddressCode]) -> List[ThreeAddressCode]:
+        """
+        Constant folding and copy propagation in one forward pass, starting
+        each basic block from the values available on every path into it,
+        followed by dead code elimination over the result
+        """
+        blocks, preds, entries = self.build_cfg(code)
+        self._pure_funcs = self._compute_pure_funcs(code)
+        self._function_code = code
+        self._evaluator = None
         
-        # Apply copy propagation
-        self.code = self.copy_propagation(self.code)
+        block_code = self.rewrite_blocks(code, blocks, preds, entries)
         
-        # Apply dead code elimination
-        self.code = self.dead_code_elimination(self.code)
+        # The rewritten blocks are streamed rather than joined into a list
+        self.changed = any(rewritten is not instr
+                           for instr, rewritten in zip(code, chain.from_iterable(block_code)))
         
-        return self.code
+        # Rewriting maps each instruction to one instruction, so the blocks
+        # of the original code are the blocks of the rewritten code
+        optimized = self.dead_code_elimination(block_code, preds)
+        if len(optimized) != len(code):
+            self.changed = True
+        return optimized
+    
+    def build_cfg(self, code: List[ThreeAddressCode]) -> Tuple[List[Tuple[int, int]], List[List[int]], Set[int]]:
+        """
+        Split code into basic blocks
+        Returns the (start, end) range of each block, the predecessors of
+        each block and the blocks control can enter from outside (the
+        program start and each function body)
+        """
+        labels: Dict[str, int] = {}
+        for i, instr in enumerate(code):
+            if instr.op == 'label':
+                labels.setdefault(instr.result, i)
+        
+        # Where control goes after each block-ending instruction, as in the
+        # interpreter: begin_func skips past its end_func, return leaves
+        jumps: Dict[int, List[int]] = {}
+        leaders = {0}
+        entry_pcs = {0}
+        open_funcs = []
+        for i, instr in enumerate(code):
+            op = instr.op
+            if op == 'label':
+                leaders.add(i)
+            elif op == 'goto':
+                jumps[i] = [labels[instr.result]] if instr.result in labels else []
+            elif op in ('if_false', 'if_true'):
+                jumps[i] = ([labels[instr.result]] if instr.result in labels else []) + [i + 1]
+            elif op == 'return':
+                jumps[i] = []
+            elif op == 'begin_func':
+                jumps[i] = []
+                entry_pcs.add(i + 1)
+                open_funcs.append(i)
+            elif op == 'end_func' and open_funcs:
+                jumps[open_funcs.pop()] = [i + 1]
+        for i in jumps:
+            leaders.add(i + 1)
+        leaders.update(target for targets in jumps.values() for target in targets)
+        
+        starts = sorted(pc for pc in leaders if pc < len(code))
+        block_of = {pc: b for b, pc in enumerate(starts)}
+        blocks = list(zip(starts, starts[1:] + [len(code)]))
+        
+        preds: List[List[int]] = [[] for _ in blocks]
+        for b, (start, end) in enumerate(blocks):
+            last = end - 1
+            for target in jumps.get(last, [end]):
+                if target in block_of:
+                    preds[block_of[target]].append(b)
+        entries = {block_of[pc] for pc in entry_pcs if pc in block_of}
+        return blocks, preds, entries
     
-    def constant_folding(self, code: List[ThreeAddressCode]) -> List[ThreeAddressCode]:
+    def rewrite_blocks(self, code: List[ThreeAddressCode], blocks: List[Tuple[int, int]],
+                       preds: List[List[int]], entries: Set[int]) -> List[List[ThreeAddressCode]]:
+        """
+        Fold and propagate within each block, starting from the constants and
+        copies that hold on every path reaching it
+        """
+        block_in: List[Optional[Tuple[Dict, Dict]]] = [None] * len(blocks)
+        block_out: List[Optional[Tuple[Dict, Dict]]] = [None] * len(blocks)
+        block_code: List[Optional[List[ThreeAddressCode]]] = [None] * len(blocks)
+        
+        changed = True
+        while changed:
+            changed = False
+            for b, (start, end) in enumerate(blocks):
+                if b in entries:
+                    state = ({}, {})
+                else:
+                    # Predecessors not reached yet don't constrain the block
+                    reached = [block_out[p] for p in preds[b] if block_out[p] is not None]
+                    if not reached:
+                        continue
+                    state = (self.intersect([out[0] for out in reached]),
+                             self.intersect([out[1] for out in reached]))
+                if state == block_in[b]:
+                    continue
+                block_in[b] = state
+                
+                # The last rewrite of a block is made from its final state
+                constants, copies = dict(state[0]), dict(state[1])
+                block_code[b] = self.rewrite_block(code[start:end], constants, copies)
+                block_out[b] = (constants, copies)
+                changed = True
+        
+        # Unreachable blocks start with nothing known
+        for b, (start, end) in enumerate(blocks):
+            if block_code[b] is None:
+                block_code[b] = self.rewrite_block(code[start:end], {}, {})
+        return block_code
+    
+    def rewrite_block(self, block: List[ThreeAddressCode], constants: Dict[str, any],
+                      copies: Dict[str, str]) -> List[ThreeAddressCode]:
+        """Fold, propagate copies into and reuse common expressions in one block"""
+        available: Dict[tuple, str] = {}  # Expression key -> variable holding its value
+        rewritten = []
+        for i, instr in enumerate(block):
+            # Each instruction is folded, then has copies propagated into it
+            instr = self.propagate_copies(self.fold_constants(instr, constants), copies)
+            if instr.op == 'call' and instr.arg1 in self._pure_funcs:
+                instr = self.fold_call(instr, block, i, rewritten, constants)
+            rewritten.append(self.eliminate_common(instr, available, copies))
+        return rewritten
+    
+    def fold_call(self, instr: ThreeAddressCode, block: List[ThreeAddressCode], i: int,
+                  rewritten: List[ThreeAddressCode], constants: Dict[str, any]) -> ThreeAddressCode:
+        """
+        Evaluate a call to a pure function with constant arguments at
+        compile time, turning its param instructions into nops
+        Example: param 5; t1 = call sq, 1 => nop; t1 = 25
+        """
+        count = instr.arg2
+        if len(rewritten) < count:
+            return instr
+        params = rewritten[len(rewritten) - count:]
+        if any(param.op != 'param' for param in params):
+            return instr
+        args = [self.constant_operand(param.arg1, constants) for param in params]
+        if any(arg is None for arg in args):
+            return instr
+        
+        # A call inside a later call's argument window stays, so that call
+        # keeps the arguments it collects
+        for later in range(i + 1, len(block)):
+            if block[later].op == 'call' and later - block[later].arg2 <= i:
+                return instr
+        
+        folded, value = self.evaluate_call(instr.arg1, args)
+        if not folded or (instr.result and value.__class__ not in (int, float, bool, str)):
+            return instr
+        
+        nop = ThreeAddressCode('nop', None, None, None)
+        rewritten[len(rewritten) - count:] = [nop] * count
+        if not instr.result:
+            return nop
+        constants[instr.result] = value
+        return ThreeAddressCode('assign', self.literal(value), None, instr.result)
+    
+    def evaluate_call(self, name: str, args: List[Any]) -> Tuple[bool, Any]:
+        """Run a pure function on constant arguments as (evaluated, returned value)"""
+        # Types are part of the key, since 1 == 1.0 == True
+        key = (name,) + tuple((type(arg), arg) for arg in args)
+        result = self._call_results.get(key)
+        if result is None:
+            if self._evaluator is None:
+                self._evaluator = Interpreter(self.function_regions(self._function_code))
+            try:
+                result = (True, self._evaluator.call_function(name, args, MAX_FOLDED_CALL_STEPS))
+            except Exception:
+                # Errors (including reads of the caller's variables) are
+                # left for run time
+                result = (False, None)
+            self._call_results[key] = result
+        return result
+    
+    @staticmethod
+    def function_regions(code: List[ThreeAddressCode]) -> List[ThreeAddressCode]:
+        """Get the begin_func ... end_func instructions of code"""
+        regions = []
+        depth = 0
+        for instr in code:
+            if instr.op == 'begin_func':
+                depth += 1
+            if depth:
+                regions.append(instr)
+            if instr.op == 'end_func' and depth:
+                depth -= 1
+        return regions
+    
+    def _compute_pure_funcs(self, code: List[ThreeAddressCode]) -> Set[str]:
+        """
+        Find the functions whose result depends only on their arguments:
+        bodies without output, input, random numbers or arrays, calling only
+        such functions
+        """
+        callees: Dict[str, Set[str]] = {}
+        impure: Set[str] = set()
+        current = None
+        for instr in code:
+            op = instr.op
+            if op == 'begin_func':
+                if current is not None or instr.arg1 in callees:
+                    # Nested or redefined functions are left alone
+                    impure.add(instr.arg1)
+                    if current is not None:
+                        impure.add(current)
+                current = instr.arg1
+                callees.setdefault(current, set())
+            elif op == 'end_func':
+                current = None
+            elif current is not None:
+                if op not in PURE_FUNCTION_OPS:
+                    impure.add(current)
+                elif op == 'call':
+                    callees[current].add(instr.arg1)
+        
+        pure = set(callees) - impure
+        changed = True
+        while changed:
+            changed = False
+            for name in list(pure):
+                if not callees[name] <= pure:
+                    pure.discard(name)
+                    changed = True
+        return pure
+    
+    @staticmethod
+    def intersect(states: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Keep the facts every state agrees on"""
+        first, rest = states[0], states[1:]
+        # Compare types too, since 1 == 1.0 == True
+        return {
+            var: value for var, value in first.items()
+            if all(var in other and type(other[var]) is type(value) and other[var] == value
+                   for other in rest)
+        }
+    
+    def fold_constants(self, instr: ThreeAddressCode, constants: Dict[str, any]) -> ThreeAddressCode:
         """
         Constant folding: Evaluate constant expressions at compile time
         Example: t1 = 2 + 3 => t1 = 5
         """
-        optimized = []
-        constants: Dict[str, any] = {}  # Map variable names to constant values
+        # Control flow only starts and ends blocks
+        if instr.op in CONTROL_FLOW_OPS:
+            return instr
         
-        for instr in code:
-            # Clear all constants when encountering control flow (labels, gotos)
-            # This prevents incorrect optimization across loop boundaries
-            if instr.op in ['label', 'goto', 'if_false', 'if_true']:
-                constants.clear()
-                optimized.append(instr)
-                continue
-            
-            # Track constant assignments
-            if instr.op == 'assign':
-                if self.is_constant(instr.arg1):
-                    constants[instr.result] = self.get_constant_value(instr.arg1)
-                    optimized.append(instr)
-                elif instr.arg1 in constants:
-                    # Propagate constant
-                    value = constants[instr.arg1]
-                    optimized.append(ThreeAddressCode('assign', value, None, instr.result))
-                    constants[instr.result] = value
-                else:
-                    optimized.append(instr)
-                    # Variable is no longer constant
-                    if instr.result in constants:
-                        del constants[instr.result]
+        # Track constant assignments
+        if instr.op == 'assign':
+            value = constants.get(instr.arg1)
+            if value is not None:
+                # Propagate constant
+                constants[instr.result] = value
+                return ThreeAddressCode('assign', self.literal(value), None, instr.result)
+            value = self.get_constant_value(instr.arg1)
+            if value is not None:
+                constants[instr.result] = value
+                return instr
+            # Variable is no longer constant
+            constants.pop(instr.result, None)
+            return instr
+        
+        # Fold binary operations with constant operands
+        if instr.op in FOLDABLE_OPS:
+            arg1_val = self.constant_operand(instr.arg1, constants)
+            arg2_val = self.constant_operand(instr.arg2, constants)
             
-            # Fold binary operations with constant operands
-            elif instr.op in ['+', '-', '*', '/', '%', '**', '<', '>', '<=', '>=', '==', '!=']:
-                arg1_val = constants.get(instr.arg1) if instr.arg1 in constants else self.get_constant_value(instr.arg1) if self.is_constant(instr.arg1) else None
-                arg2_val = constants.get(instr.arg2) if instr.arg2 in constants else self.get_constant_value(instr.arg2) if self.is_constant(instr.arg2) else None
-                
-                if arg1_val is not None and arg2_val is not None:
-                    # Both operands are constants, evaluate at compile time
-                    try:
-                        result_val = self.evaluate_operation(instr.op, arg1_val, arg2_val)
-                        optimized.append(ThreeAddressCode('assign', result_val, None, instr.result))
-                        constants[instr.result] = result_val
-                    except:
-                        # If evaluation fails, keep original instruction
-                        optimized.append(instr)
-                else:
-                    optimized.append(instr)
-                    # Result is no longer constant
-                    if instr.result in constants:
-                        del constants[instr.result]
+            if arg1_val is not None and arg2_val is not None:
+                # Both operands are constants, evaluate at compile time
+                try:
+                    result_val = self.evaluate_operation(instr.op, arg1_val, arg2_val)
+                except Exception:
+                    # If evaluation fails, keep original instruction
+                    constants.pop(instr.result, None)
+                    return instr
+                constants[instr.result] = result_val
+                return ThreeAddressCode('assign', self.literal(result_val), None, instr.result)
             
-            # Fold unary operations
-            elif instr.op in ['-', 'not']:
-                arg_val = constants.get(instr.arg1) if instr.arg1 in constants else self.get_constant_value(instr.arg1) if self.is_constant(instr.arg1) else None
-                
-                if arg_val is not None:
-                    if instr.op == '-':
-                        result_val = -arg_val
-                    elif instr.op == 'not':
-                        result_val = not arg_val
-                    optimized.append(ThreeAddressCode('assign', result_val, None, instr.result))
-                    constants[instr.result] = result_val
-                else:
-                    optimized.append(instr)
+            # Result is no longer constant
+            constants.pop(instr.result, None)
             
-            else:
-                # For all other instructions, clear constants that might be modified
-                if instr.result and instr.result in constants:
-                    del constants[instr.result]
-                optimized.append(instr)
+            # x * 1, x - 0, ... are just x
+            operand = self.identity_operand(instr, arg1_val, arg2_val)
+            if operand is not None:
+                return ThreeAddressCode('assign', operand, None, instr.result)
+            return instr
         
-        return optimized
+        # Fold logical NOT
+        if instr.op == 'not':
+            arg_val = self.constant_operand(instr.arg1, constants)
+            if arg_val is not None:
+                result_val = not arg_val
+                constants[instr.result] = result_val
+                return ThreeAddressCode('assign', self.literal(result_val), None, instr.result)
+            constants.pop(instr.result, None)
+            return instr
+        
+        # For all other instructions, clear constants that might be modified
+        written = self.written_var(instr)
+        if written:
+            constants.pop(written, None)
+        return instr
+    
+    @staticmethod
+    def identity_operand(instr: ThreeAddressCode, arg1_val, arg2_val):
+        """Get the operand an operation with an identity element reduces to, if any"""
+        # Only int identities: x * 1.0 or True * 1 would change the result type
+        if type(arg2_val) is int and RIGHT_IDENTITIES.get(instr.op) == arg2_val:
+            return instr.arg1
+        if type(arg1_val) is int and LEFT_IDENTITIES.get(instr.op) == arg1_val:
+            return instr.arg2
+        return None
     
-    def copy_propagation(self, code: List[ThreeAddressCode]) -> List[ThreeAddressCode]:
+    def propagate_copies(self, instr: ThreeAddressCode, copies: Dict[str, str]) -> ThreeAddressCode:
         """
         Copy propagation: Replace variable with its value
         Example: x = y; z = x + 1 => x = y; z = y + 1
         """
-        optimized = []
-        copies: Dict[str, str] = {}  # Map variable to its copy source
+        # Control flow only starts and ends blocks
+        if instr.op in CONTROL_FLOW_OPS:
+            return instr
         
-        for instr in code:
-            # Clear all copies when encountering control flow (labels, gotos)
-            # This prevents incorrect optimization across loop boundaries
-            if instr.op in ['label', 'goto', 'if_false', 'if_true']:
-                copies.clear()
-                optimized.append(instr)
-                continue
-            
-            # Track simple copies
-            if instr.op == 'assign' and isinstance(instr.arg1, str) and not self.is_constant(instr.arg1):
-                copies[instr.result] = instr.arg1
-                optimized.append(instr)
-            
+        # Track simple copies, following chains back to the original source
+        if instr.op == 'assign' and isinstance(instr.arg1, str) and not self.is_constant(instr.arg1):
+            source = copies.get(instr.arg1, instr.arg1)
+            self.kill_copies(copies, instr.result)
+            if source != instr.result:
+                copies[instr.result] = source
+            if source == instr.arg1:
+                return instr
+            return ThreeAddressCode('assign', source, None, instr.result)
+        
+        if instr.op in COPY_OPS:
             # Propagate copies in binary operations
-            elif instr.op in ['+', '-', '*', '/', '%', '**', '<', '>', '<=', '>=', '==', '!=', 'and', 'or']:
-                arg1 = copies.get(instr.arg1, instr.arg1)
-                arg2 = copies.get(instr.arg2, instr.arg2)
-                optimized.append(ThreeAddressCode(instr.op, arg1, arg2, instr.result))
-                # Result is not a copy
-                if instr.result in copies:
-                    del copies[instr.result]
-            
+            arg1 = copies.get(instr.arg1, instr.arg1)
+            arg2 = copies.get(instr.arg2, instr.arg2)
+        elif instr.op == 'not':
             # Propagate copies in unary operations
-            elif instr.op in ['-', 'not']:
-                arg1 = copies.get(instr.arg1, instr.arg1)
-                optimized.append(ThreeAddressCode(instr.op, arg1, None, instr.result))
-                if instr.result in copies:
-                    del copies[instr.result]
-            
-            # Propagate in other instructions
-            else:
-                new_instr = ThreeAddressCode(instr.op, instr.arg1, instr.arg2, instr.result)
-                if instr.arg1 and isinstance(instr.arg1, str) and instr.arg1 in copies:
-                    new_instr.arg1 = copies[instr.arg1]
-                if instr.arg2 and isinstance(instr.arg2, str) and instr.arg2 in copies:
-                    new_instr.arg2 = copies[instr.arg2]
-                optimized.append(new_instr)
-                
-                # Clear copy information if variable is modified
-                if instr.result and instr.result in copies:
-                    del copies[instr.result]
+            arg1 = copies.get(instr.arg1, instr.arg1)
+            arg2 = None
+        else:
+            # Propagate in other instructions (arg1 of function ops is a name)
+            arg1 = instr.arg1
+            arg2 = instr.arg2
+            if arg1.__class__ is tuple:
+                # Array literal elements
+                if any(arg in copies for arg in arg1):
+                    arg1 = tuple(copies.get(arg, arg) for arg in arg1)
+            elif arg1 and isinstance(arg1, str) and instr.op not in NAME_OPS:
+                arg1 = copies.get(arg1, arg1)
+            if arg2 and isinstance(arg2, str):
+                arg2 = copies.get(arg2, arg2)
         
-        return optimized
+        # Written variable is not a copy
+        written = self.written_var(instr)
+        if written:
+            self.kill_copies(copies, written)
+        
+        if arg1 is instr.arg1 and arg2 is instr.arg2:
+            return instr
+        return ThreeAddressCode(instr.op, arg1, arg2, instr.result)
     
-    def dead_code_elimination(self, code: List[ThreeAddressCode]) -> List[ThreeAddressCode]:
+    def eliminate_common(self, instr: ThreeAddressCode, available: Dict[tuple, str],
+                         copies: Dict[str, str]) -> ThreeAddressCode:
         """
-        Dead code elimination: Remove unused variable assignments
+        Common subexpression elimination: Reuse an expression computed
+        earlier in the block
+        Example: t1 = a + b; t2 = a + b => t1 = a + b; t2 = t1
         """
-        # First pass: identify all used variables
-        used_vars: Set[str] = set()
+        written = self.written_var(instr)
+        if instr.op in ARRAY_UPDATE_OPS or instr.op == 'call':
+            # The array may be reached through other names (and a call may
+            # update any array), so every expression could be out of date
+            available.clear()
+        elif written:
+            # Expressions reading or held in the variable are out of date
+            for key in [key for key, holder in available.items()
+                        if holder == written or written in key]:
+                del available[key]
         
-        for instr in code:
-            # Add variables used as operands
-            if instr.arg1 and isinstance(instr.arg1, str) and not self.is_constant(instr.arg1):
-                used_vars.add(instr.arg1)
-            if instr.arg2 and isinstance(instr.arg2, str) and not self.is_constant(instr.arg2):
-                used_vars.add(instr.arg2)
-            
-            # Variables used in control flow, calls, returns, prints are live
-            if instr.op in ['if_false', 'if_true', 'return', 'print', 'param', 'call']:
-                if instr.arg1 and isinstance(instr.arg1, str):
-                    used_vars.add(instr.arg1)
-                if instr.result and isinstance(instr.result, str) and instr.op != 'label':
-                    used_vars.add(instr.result)
+        if instr.op not in PURE_OPS:
+            return instr
         
-        # Second pass: keep only instructions that define used variables or have side effects
-        optimized = []
+        # Operand types are part of the key, since 1 == 1.0 == True
+        key = (instr.op, type(instr.arg1), instr.arg1, type(instr.arg2), instr.arg2)
+        holder = available.get(key)
+        if holder is None and instr.op in COMMUTATIVE_OPS:
+            holder = available.get((instr.op, type(instr.arg2), instr.arg2, type(instr.arg1), instr.arg1))
         
-        for instr in code:
-            # Always keep control flow, function markers, prints, returns, calls
-            if instr.op in ['label', 'goto', 'if_false', 'if_true', 'begin_func', 'end_func', 
-                           'print', 'return', 'call', 'param']:
-                optimized.append(instr)
-            
-            # Keep assignments to used variables
-            elif instr.result:
-                # Keep if result is used, or if it's a regular variable (not temp)
-                if instr.result in used_vars or not instr.result.startswith('t'):
-                    optimized.append(instr)
-            
-            else:
-                optimized.append(instr)
+        if holder is None:
+            # An expression reading its own result is not available afterwards
+            if instr.result != instr.arg1 and instr.result != instr.arg2:
+                available[key] = instr.result
+            return instr
         
+        copies[instr.result] = holder
+        return ThreeAddressCode('assign', holder, None, instr.result)
+    
+    @staticmethod
+    def kill_copies(copies: Dict[str, str], var: str):
+        """Forget copies of and from a variable that is being written"""
+        copies.pop(var, None)
+        if var in copies.values():
+            for copy in [copy for copy, source in copies.items() if source == var]:
+                del copies[copy]
+    
+    @staticmethod
+    def written_var(instr: ThreeAddressCode):
+        """Get the variable an instruction writes, if any"""
+        if instr.op == 'param_decl':
+            return instr.arg1
+        if instr.op in CONTROL_FLOW_OPS:
+            return None
+        return instr.result
+    
+    def dead_code_elimination(self, block_code: List[List[ThreeAddressCode]],
+                              preds: List[List[int]]) -> List[ThreeAddressCode]:
+        """
+        Dead code elimination: Remove temporaries that are not live after
+        their assignment
+        """
+        var_ids: Dict[str, int] = {}  # Variable -> bit in a live set
+        
+        # (read, written) variable sets of each instruction. Functions read
+        # their caller's variables by name, so a call may read any variable
+        # read inside a function body
+        effects = []
+        calls = []
+        function_reads = 0
+        depth = 0
+        for block in block_code:
+            block_effects = []
+            for instr in block:
+                used = self.uses(instr, var_ids)
+                if instr.op == 'begin_func':
+                    depth += 1
+                elif instr.op == 'end_func' and depth:
+                    depth -= 1
+                elif depth:
+                    function_reads |= used
+                if instr.op == 'call':
+                    calls.append((len(effects), len(block_effects)))
+                block_effects.append((used, self.defines(instr, var_ids)))
+            effects.append(block_effects)
+        for b, k in calls:
+            used, written = effects[b][k]
+            effects[b][k] = (used | function_reads, written)
+        
+        # Variables each block reads before writing them, and writes
+        block_use = []
+        block_def = []
+        for block_effects in effects:
+            use = defs = 0
+            for used, written in reversed(block_effects):
+                use = (use & ~written) | used
+                defs |= written
+            block_use.append(use)
+            block_def.append(defs)
+        
+        succs: List[List[int]] = [[] for _ in block_code]
+        for b, block_preds in enumerate(preds):
+            for p in block_preds:
+                succs[p].append(b)
+        
+        # Live sets only grow, so iterating backwards reaches a fixed point
+        live_in = [0] * len(block_code)
+        live_out = [0] * len(block_code)
+        changed = True
+        while changed:
+            changed = False
+            for b in reversed(range(len(block_code))):
+                out = 0
+                for succ in succs[b]:
+                    out |= live_in[succ]
+                new_in = block_use[b] | (out & ~block_def[b])
+                live_out[b] = out
+                if new_in != live_in[b]:
+                    live_in[b] = new_in
+                    changed = True
+        
+        optimized = []
+        for block, block_effects, live in zip(block_code, effects, live_out):
+            kept = []
+            for instr, (used, written) in zip(reversed(block), reversed(block_effects)):
+                # Param instructions of calls evaluated at compile time
+                if instr.op == 'nop':
+                    continue
+                # Only temporaries are removed - user variables are kept, so
+                # an assignment that fails at run time still fails
+                if (written and not written & live and instr.op not in SIDE_EFFECT_OPS
+                        and instr.result in self.temps):
+                    continue
+                live = (live & ~written) | used
+                kept.append(instr)
+            kept.reverse()
+            optimized.extend(kept)
         return optimized
     
+    def uses(self, instr: ThreeAddressCode, var_ids: Dict[str, int]) -> int:
+        """Get the set of variables an instruction reads (besides those a call reads)"""
+        op = instr.op
+        used = 0
+        if instr.arg1.__class__ is tuple:
+            # Array literals carry their element operands
+            for arg in instr.arg1:
+                if self.is_variable(arg):
+                    used |= self.var_bit(arg, var_ids)
+        elif op not in NAME_OPS and self.is_variable(instr.arg1):
+            used |= self.var_bit(instr.arg1, var_ids)
+        if isinstance(instr.arg2, tuple):
+            # substr carries its (start, end) operands as a pair
+            for arg in instr.arg2:
+                if self.is_variable(arg):
+                    used |= self.var_bit(arg, var_ids)
+        elif self.is_variable(instr.arg2):
+            used |= self.var_bit(instr.arg2, var_ids)
+        if op in ARRAY_UPDATE_OPS:
+            used |= self.var_bit(instr.result, var_ids)
+        return used
+    
+    def defines(self, instr: ThreeAddressCode, var_ids: Dict[str, int]) -> int:
+        """Get the set holding the variable an instruction assigns, if any"""
+        if instr.op in ARRAY_UPDATE_OPS:
+            # Updates the array in place
+            return 0
+        written = self.written_var(instr)
+        if not written:
+            return 0
+        return self.var_bit(written, var_ids)
+    
+    @staticmethod
+    def var_bit(var: str, var_ids: Dict[str, int]) -> int:
+        """Get the live set bit of a variable"""
+        bit = var_ids.get(var)
+        if bit is None:
+            bit = var_ids[var] = 1 << len(var_ids)
+        return bit
+    
     # ============= Helper Methods =============
     
     def is_constant(self, value) -> bool:
         """Check if value is a constant literal"""
-        if isinstance(value, (int, float, bool)):
+        if isinstance(value, (int, float, bool, StringLiteral)):
             return True
         if isinstance(value, str):
-            # Check if it's a string literal (in quotes) or a number
-            if value.startswith('"') and value.endswith('"'):
-                return True
-            try:
-                float(value)
-                return True
-            except:
-                return False
+            return self.parse_literal(value)[0]
         return False
     
+    def is_variable(self, value) -> bool:
+        """Check if value is a variable name"""
+        if value.__class__ is not str or not value:
+            return False
+        parsed = self._literal_cache.get(value)
+        if parsed is None:
+            parsed = self.parse_literal(value)
+        return not parsed[0]
+    
+    def constant_operand(self, value, constants: Dict[str, any]):
+        """Get the constant value of an operand, or None if it is not constant"""
+        # No constant is None, so one probe tells whether the operand is known
+        known = constants.get(value)
+        if known is not None:
+            return known
+        if value.__class__ is str:
+            parsed = self._literal_cache.get(value)
+            if parsed is None:
+                parsed = self.parse_literal(value)
+            return parsed[1]
+        return self.get_constant_value(value)
+    
     def get_constant_value(self, value):
         """Extract constant value"""
         if isinstance(value, (int, float, bool)):
             return value
+        if isinstance(value, StringLiteral):
+            return value.text
         if isinstance(value, str):
-            if value.startswith('"') and value.endswith('"'):
-                return value[1:-1]
-            try:
-                if '.' in value:
-                    return float(value)
-                return int(value)
-            except:
-                return None
+            return self.parse_literal(value)[1]
         return None
     
+    @staticmethod
+    def literal(value):
+        """Get the operand for a folded constant value"""
+        if isinstance(value, str):
+            return StringLiteral(value)
+        return value
+    
+    def parse_literal(self, value: str) -> Tuple[bool, Any]:
+        """Classify a string operand as (is constant, constant value)"""
+        # The same names and literals recur throughout the code, so each
+        # distinct string is only parsed once
+        parsed = self._literal_cache.get(value)
+        if parsed is None:
+            parsed = self._literal_cache[value] = self._parse_literal_uncached(value)
+        return parsed
+    
+    @staticmethod
+    def _parse_literal_uncached(value: str) -> Tuple[bool, Any]:
+        # String literals are StringLiteral operands, so only numbers remain
+        match = NUMBER_RE.match(value)
+        if match is None:
+            return False, None
+        if match.group('fraction') or match.group('exponent'):
+            return True, float(value)
+        return True, int(value)
+    
     def evaluate_operation(self, op: str, left, right):
         """Evaluate binary operation on constants"""
-        if op == '+':
-            return left + right
-        elif op == '-':
-            return left - right
-        elif op == '*':
-            return left * right
-        elif op == '/':
-            if isinstance(left, int) and isinstance(right, int):
-                return left // right
-            return left / right
-        elif op == '%':
-            return left % right
-        elif op == '**':
-            return left ** right
-        elif op == '<':
-            return left < right
-        elif op == '>':
-            return left > right
-        elif op == '<=':
-            return left <= right
-        elif op == '>=':
-            return left >= right
-        elif op == '==':
-            return left == right
-        elif op == '!=':
-            return left != right
-        else:
+        func = FOLDABLE_OPS.get(op)
+        if func is None:
             raise ValueError(f"Unknown operator: {op}")
+        return func(left, right)
 
 
 def test_optimizer():
     """Test the optimizer"""
     from lexer import Lexer
     from parser import Parser
+    from contextlib import redirect_stdout
+    import io
     
     test_code = """
     int a = 5 + 3;
@@ -286,13 +752,58 @@ def test_optimizer():
     print("=== Original Intermediate Code ===")
     print(ir_gen.get_code_string())
     
-    optimizer = Optimizer(ir_gen.code)
+    optimizer = Optimizer(ir_gen.code, ir_gen.temps)
     optimized_code = optimizer.optimize()
     
     print("\n=== Optimized Intermediate Code ===")
     for instr in optimized_code:
         print(instr)
 
+    # A dead store to a user variable must survive - here the division
+    # still has to fail at run time, whatever the variable is called
+    for name in ('total', 't1'):
+        regression_code = f"""
+        int a = 0;
+        int {name} = 5 / a;
+        {name} = 4;
+        print({name});
+        """
+        ir_gen = IRGenerator()
+        ir_gen.generate(Parser(Lexer(regression_code).tokenize()).parse())
+        optimized_code = Optimizer(ir_gen.code, ir_gen.temps).optimize()
+        assert any(instr.op == '/' for instr in optimized_code), \
+            f"dead store to user variable '{name}' was removed"
+    print("\nDead stores to user variables kept")
+
+    # Array comparisons must be recomputed once the array is updated,
+    # whether through another name or inside a called function
+    for regression_code in ("""
+        int[] a = [1, 2, 3];
+        int[] b = a;
+        int[] c = [9, 2, 3];
+        bool e1 = a == c;
+        b[0] = 9;
+        bool e2 = a == c;
+        print(e1, e2);
+        """, """
+        int[] a = [1, 2, 3];
+        int[] c = [9, 2, 3];
+        function int g() {
+            a[0] = 9;
+            return 0;
+        }
+        bool e1 = a == c;
+        int r = g();
+        bool e2 = a == c;
+        print(e1, e2);
+        """):
+        ir_gen = IRGenerator()
+        ir_gen.generate(Parser(Lexer(regression_code).tokenize()).parse())
+        with redirect_stdout(io.StringIO()):
+            output = Interpreter(Optimizer(ir_gen.code, ir_gen.temps).optimize()).execute()
+        assert output == ['False', 'True'], f"stale array comparison: {output}"
+    print("Array comparisons recomputed after updates")
+
 
 if __name__ == "__main__":
     test_optimizer()
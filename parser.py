@@ -5,8 +5,9 @@ Uses recursive descent parsing
 """
 
 from lexer import Token, TokenType, Lexer
-from typing import List, Optional, Any
+from typing import Any, Callable, Dict, List, Optional
 from dataclasses import dataclass
+import gc
 
 
 # ============= AST Node Definitions =============
@@ -14,6 +15,9 @@ from dataclasses import dataclass
 @dataclass
 class ASTNode:
     """Base class for all AST nodes"""
+    
+    __slots__ = ('line', 'column')
+    
     line: int
     column: int
 
@@ -21,12 +25,18 @@ class ASTNode:
 @dataclass
 class Program(ASTNode):
     """Root node of the program"""
+    
+    __slots__ = ('statements',)
+    
     statements: List[ASTNode]
 
 
 @dataclass
 class BinaryOp(ASTNode):
     """Binary operation (e.g., a + b)"""
+    
+    __slots__ = ('left', 'operator', 'right')
+    
     left: ASTNode
     operator: str
     right: ASTNode
@@ -35,6 +45,9 @@ class BinaryOp(ASTNode):
 @dataclass
 class UnaryOp(ASTNode):
     """Unary operation (e.g., -a, not b)"""
+    
+    __slots__ = ('operator', 'operand')
+    
     operator: str
     operand: ASTNode
 
@@ -42,6 +55,9 @@ class UnaryOp(ASTNode):
 @dataclass
 class Literal(ASTNode):
     """Literal value (int, float, string, bool)"""
+    
+    __slots__ = ('value', 'type')
+    
     value: Any
     type: str  # 'int', 'float', 'string', 'bool'
 
@@ -49,12 +65,18 @@ class Literal(ASTNode):
 @dataclass
 class Identifier(ASTNode):
     """Variable or function identifier"""
+    
+    __slots__ = ('name',)
+    
     name: str
 
 
 @dataclass
 class VarDeclaration(ASTNode):
     """Variable declaration"""
+    
+    __slots__ = ('var_type', 'name', 'initializer')
+    
     var_type: str  # 'int', 'float', 'bool', 'string'
     name: str
     initializer: Optional[ASTNode]
@@ -63,6 +85,9 @@ class VarDeclaration(ASTNode):
 @dataclass
 class Assignment(ASTNode):
     """Variable assignment"""
+    
+    __slots__ = ('name', 'value')
+    
     name: str
     value: ASTNode
 
@@ -70,6 +95,9 @@ class Assignment(ASTNode):
 @dataclass
 class IfStatement(ASTNode):
     """If-else statement"""
+    
+    __slots__ = ('condition', 'then_block', 'else_block')
+    
     condition: ASTNode
     then_block: List[ASTNode]
     else_block: Optional[List[ASTNode]]
@@ -78,6 +106,9 @@ class IfStatement(ASTNode):
 @dataclass
 class WhileStatement(ASTNode):
     """While loop"""
+    
+    __slots__ = ('condition', 'body')
+    
     condition: ASTNode
     body: List[ASTNode]
 
@@ -85,6 +116,9 @@ class WhileStatement(ASTNode):
 @dataclass
 class ForStatement(ASTNode):
     """For loop"""
+    
+    __slots__ = ('init', 'condition', 'update', 'body')
+    
     init: ASTNode
     condition: ASTNode
     update: ASTNode
@@ -94,6 +128,9 @@ class ForStatement(ASTNode):
 @dataclass
 class FunctionDef(ASTNode):
     """Function definition"""
+    
+    __slots__ = ('return_type', 'name', 'parameters', 'body')
+    
     return_type: str
     name: str
     parameters: List[tuple]  # [(type, name), ...]
@@ -103,6 +140,9 @@ class FunctionDef(ASTNode):
 @dataclass
 class FunctionCall(ASTNode):
     """Function call"""
+    
+    __slots__ = ('name', 'arguments')
+    
     name: str
     arguments: List[ASTNode]
 
@@ -110,30 +150,45 @@ class FunctionCall(ASTNode):
 @dataclass
 class ReturnStatement(ASTNode):
     """Return statement"""
+    
+    __slots__ = ('value',)
+    
     value: Optional[ASTNode]
 
 
 @dataclass
 class PrintStatement(ASTNode):
     """Print statement"""
+    
+    __slots__ = ('expressions',)
+    
     expressions: List[ASTNode]
 
 
 @dataclass
 class Block(ASTNode):
     """Block of statements"""
+    
+    __slots__ = ('statements',)
+    
     statements: List[ASTNode]
 
 
 @dataclass
 class ArrayLiteral(ASTNode):
     """Array literal [1, 2, 3]"""
+    
+    __slots__ = ('elements',)
+    
     elements: List[ASTNode]
 
 
 @dataclass
 class ArrayAccess(ASTNode):
     """Array element access arr[index]"""
+    
+    __slots__ = ('array', 'index')
+    
     array: ASTNode
     index: ASTNode
 
@@ -141,6 +196,9 @@ class ArrayAccess(ASTNode):
 @dataclass
 class ArrayAssignment(ASTNode):
     """Array element assignment arr[index] = value"""
+    
+    __slots__ = ('array', 'index', 'value')
+    
     array: str
     index: ASTNode
     value: ASTNode
@@ -149,19 +207,83 @@ class ArrayAssignment(ASTNode):
 @dataclass
 class BuiltInCall(ASTNode):
     """Built-in function call (len, random, substr, concat, input)"""
+    
+    __slots__ = ('function', 'arguments')
+    
     function: str
     arguments: List[ASTNode]
 
 
 # ============= Parser Implementation =============
 
+# Type keywords that start a variable declaration, with their type name
+DECLARATION_TYPES = {
+    TokenType.INT: 'int',
+    TokenType.FLOAT: 'float',
+    TokenType.BOOL: 'bool',
+    TokenType.STRING: 'string',
+}
+
+# Element type name -> array type name, so declarations share one string
+ARRAY_TYPE_NAMES = {name: name + "[]" for name in DECLARATION_TYPES.values()}
+
+# Left associative binary operator tokens -> (AST operator, precedence),
+# lowest precedence first. ** binds tighter and is parsed by parse_power
+BINARY_OPS = {
+    TokenType.OR: ('or', 1),
+    TokenType.AND: ('and', 2),
+    TokenType.EQ: ('==', 3),
+    TokenType.NE: ('!=', 3),
+    TokenType.LT: ('<', 4),
+    TokenType.GT: ('>', 4),
+    TokenType.LE: ('<=', 4),
+    TokenType.GE: ('>=', 4),
+    TokenType.PLUS: ('+', 5),
+    TokenType.MINUS: ('-', 5),
+    TokenType.MULTIPLY: ('*', 6),
+    TokenType.DIVIDE: ('/', 6),
+    TokenType.MODULO: ('%', 6),
+}
+UNARY_OPS = {TokenType.MINUS: '-', TokenType.NOT: 'not'}
+
+# Literal tokens with the type of their value
+LITERAL_TYPES = {
+    TokenType.INT_LITERAL: 'int',
+    TokenType.FLOAT_LITERAL: 'float',
+    TokenType.STRING_LITERAL: 'string',
+    TokenType.BOOL_LITERAL: 'bool',
+}
+
+# Built-in function keywords
+BUILTIN_TYPES = frozenset([TokenType.LEN, TokenType.RANDOM, TokenType.SUBSTR, TokenType.CONCAT, TokenType.INPUT])
+
+
 class Parser:
-    """Recursive descent parser for NumCalc language"""
+    """Recursive descent parser for NumCalc language
+    
+    The grammar is predictive: one token (two for identifier statements)
+    picks every production, and pos only moves forward, so no input is ever
+    parsed twice and memoizing the parse methods would only add overhead
+    """
     
     def __init__(self, tokens: List[Token]):
         self.tokens = tokens
         self.pos = 0
         self.current_token = tokens[0] if tokens else None
+        self._last_pos = len(tokens) - 1
+        
+        # First token of a statement -> method parsing the statement
+        self._statement_parsers: Dict[TokenType, Callable[[], ASTNode]] = {
+            TokenType.FUNCTION: self.parse_function_def,
+            TokenType.IF: self.parse_if_statement,
+            TokenType.WHILE: self.parse_while_statement,
+            TokenType.FOR: self.parse_for_statement,
+            TokenType.RETURN: self.parse_return_statement,
+            TokenType.PRINT: self.parse_print_statement,
+            TokenType.IDENTIFIER: self.parse_identifier_statement,
+        }
+        for token_type in DECLARATION_TYPES:
+            self._statement_parsers[token_type] = self.parse_declaration
     
     def error(self, message: str):
         """Raise a syntax error"""
@@ -176,19 +298,32 @@ class Parser:
         """Get current token without consuming"""
         return self.current_token
     
+    def peek_next_type(self) -> TokenType:
+        """Get the type of the token after the current one"""
+        # Only called on a non-EOF token, so the lexer's EOF token
+        # guarantees there is a next one
+        return self.tokens[self.pos + 1].type
+    
     def advance(self) -> Token:
         """Consume current token and move to next"""
         token = self.current_token
-        if self.pos < len(self.tokens) - 1:
-            self.pos += 1
-            self.current_token = self.tokens[self.pos]
+        pos = self.pos
+        if pos < self._last_pos:
+            self.pos = pos = pos + 1
+            self.current_token = self.tokens[pos]
         return token
     
     def expect(self, token_type: TokenType) -> Token:
         """Consume token of expected type or raise error"""
-        if self.current_token.type != token_type:
-            self.error(f"Expected {token_type.name}, got {self.current_token.type.name}")
-        return self.advance()
+        token = self.current_token
+        if token.type != token_type:
+            self.error(f"Expected {token_type.name}, got {token.type.name}")
+        # Same as advance(), inlined as expect() runs for most tokens
+        pos = self.pos
+        if pos < self._last_pos:
+            self.pos = pos = pos + 1
+            self.current_token = self.tokens[pos]
+        return token
     
     def match(self, *token_types: TokenType) -> bool:
         """Check if current token matches any of the given types"""
@@ -198,72 +333,55 @@ class Parser:
     
     def parse(self) -> Program:
         """Parse the entire program"""
-        statements = []
-        while not self.match(TokenType.EOF):
-            statements.append(self.parse_statement())
-        return Program(1, 1, statements)
+        # Parsing allocates many nodes and frees none, so collections
+        # triggered by the allocations would find nothing to collect
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            statements = []
+            while not self.match(TokenType.EOF):
+                statements.append(self.parse_statement())
+            return Program(1, 1, statements)
+        finally:
+            if gc_enabled:
+                gc.enable()
     
     def parse_statement(self) -> ASTNode:
         """Parse a single statement"""
-        # Variable declaration
-        if self.match(TokenType.INT, TokenType.FLOAT, TokenType.BOOL, TokenType.STRING):
-            return self.parse_declaration()
-        
-        # Function definition
-        elif self.match(TokenType.FUNCTION):
-            return self.parse_function_def()
-        
-        # If statement
-        elif self.match(TokenType.IF):
-            return self.parse_if_statement()
-        
-        # While loop
-        elif self.match(TokenType.WHILE):
-            return self.parse_while_statement()
-        
-        # For loop
-        elif self.match(TokenType.FOR):
-            return self.parse_for_statement()
-        
-        # Return statement
-        elif self.match(TokenType.RETURN):
-            return self.parse_return_statement()
-        
-        # Print statement
-        elif self.match(TokenType.PRINT):
-            return self.parse_print_statement()
-        
-        # Assignment or expression statement
-        elif self.match(TokenType.IDENTIFIER):
-            # Look ahead to determine if it's assignment or array assignment
-            next_token_type = self.tokens[self.pos + 1].type if self.pos + 1 < len(self.tokens) else None
-            
-            if next_token_type == TokenType.ASSIGN:
-                return self.parse_assignment()
-            elif next_token_type == TokenType.LBRACKET:
-                # Could be array access or array assignment
-                # Need to check further ahead
-                # For now, parse as assignment which handles both cases
-                return self.parse_assignment()
-            else:
-                # Expression statement (e.g., function call)
-                expr = self.parse_expression()
-                self.expect(TokenType.SEMICOLON)
-                return expr
-        
-        else:
+        # Statements are told apart by their first token
+        parse = self._statement_parsers.get(self.current_token.type)
+        if parse is None:
             self.error(f"Unexpected token: {self.current_token.type.name}")
+        return parse()
+    
+    def parse_identifier_statement(self) -> ASTNode:
+        """Parse an assignment or expression statement"""
+        # Look ahead to determine if it's assignment or array assignment
+        next_token_type = self.peek_next_type()
+        
+        if next_token_type == TokenType.ASSIGN:
+            return self.parse_assignment()
+        elif next_token_type == TokenType.LBRACKET:
+            # Could be array access or array assignment
+            # Need to check further ahead
+            # For now, parse as assignment which handles both cases
+            return self.parse_assignment()
+        else:
+            # Expression statement (e.g., function call)
+            expr = self.parse_expression()
+            self.expect(TokenType.SEMICOLON)
+            return expr
     
     def parse_declaration(self) -> VarDeclaration:
         """Parse variable declaration"""
         var_type_token = self.advance()
-        var_type = var_type_token.value if var_type_token.type == TokenType.IDENTIFIER else var_type_token.type.name.lower()
+        var_type = var_type_token.value if var_type_token.type == TokenType.IDENTIFIER else DECLARATION_TYPES[var_type_token.type]
         
         # Check for array declaration (int[], float[], etc.)
         if self.match(TokenType.LBRACKET):
             self.advance()
             self.expect(TokenType.RBRACKET)
-            var_type = var_type + "[]"  # Mark as array type
+            var_type = ARRAY_TYPE_NAMES.get(var_type) or var_type + "[]"  # Mark as array type
         
         name_token = self.expect(TokenType.IDENTIFIER)
         name = name_token.value
@@ -328,16 +446,16 @@ class Parser:
         self.expect(TokenType.LPAREN)
         
         # Initialization - can be declaration or assignment
-        if self.match(TokenType.INT, TokenType.FLOAT, TokenType.BOOL, TokenType.STRING):
+        if self.current_token.type in DECLARATION_TYPES:
             # Variable declaration: int i = 0;
             var_type_token = self.advance()
-            var_type = var_type_token.type.name.lower()
+            var_type = DECLARATION_TYPES[var_type_token.type]
             
             # Check for array declaration
             if self.match(TokenType.LBRACKET):
                 self.advance()
                 self.expect(TokenType.RBRACKET)
-                var_type = var_type + "[]"
+                var_type = ARRAY_TYPE_NAMES[var_type]
             
             init_name = self.expect(TokenType.IDENTIFIER).value
             self.expect(TokenType.ASSIGN)
@@ -373,9 +491,8 @@ class Parser:
         
         # Return type
         return_type_token = self.advance()
-        if return_type_token.type in [TokenType.INT, TokenType.FLOAT, TokenType.BOOL, TokenType.STRING]:
-            return_type = return_type_token.type.name.lower()
-        else:
+        return_type = DECLARATION_TYPES.get(return_type_token.type)
+        if return_type is None:
             self.error(f"Expected type specifier, got {return_type_token.type.name}")
         
         # Function name
@@ -397,26 +514,17 @@ class Parser:
     def parse_parameter_list(self) -> List[tuple]:
         """Parse function parameter list"""
         parameters = []
-        
-        # First parameter
-        param_type_token = self.advance()
-        if param_type_token.type in [TokenType.INT, TokenType.FLOAT, TokenType.BOOL, TokenType.STRING]:
-            param_type = param_type_token.type.name.lower()
-        else:
-            self.error(f"Expected type specifier, got {param_type_token.type.name}")
-        param_name = self.expect(TokenType.IDENTIFIER).value
-        parameters.append((param_type, param_name))
-        
-        # Additional parameters
-        while self.match(TokenType.COMMA):
-            self.advance()
+        while True:
             param_type_token = self.advance()
-            if param_type_token.type in [TokenType.INT, TokenType.FLOAT, TokenType.BOOL, TokenType.STRING]:
-                param_type = param_type_token.type.name.lower()
-            else:
+            param_type = DECLARATION_TYPES.get(param_type_token.type)
+            if param_type is None:
                 self.error(f"Expected type specifier, got {param_type_token.type.name}")
             param_name = self.expect(TokenType.IDENTIFIER).value
             parameters.append((param_type, param_name))
+            
+            if self.current_token.type != TokenType.COMMA:
+                break
+            self.advance()
         
         return parameters
     
@@ -434,13 +542,7 @@ class Parser:
         print_token = self.advance()
         self.expect(TokenType.LPAREN)
         
-        expressions = []
-        if not self.match(TokenType.RPAREN):
-            expressions.append(self.parse_expression())
-            while self.match(TokenType.COMMA):
-                self.advance()
-                expressions.append(self.parse_expression())
-        
+        expressions = self.parse_expression_list(TokenType.RPAREN)
         self.expect(TokenType.RPAREN)
         self.expect(TokenType.SEMICOLON)
         return PrintStatement(print_token.line, print_token.column, expressions)
@@ -458,105 +560,49 @@ class Parser:
     
     def parse_expression(self) -> ASTNode:
         """Parse expression (logical OR level)"""
-        return self.parse_logical_or()
-    
-    def parse_logical_or(self) -> ASTNode:
-        """Parse logical OR expression"""
-        left = self.parse_logical_and()
-        
-        while self.match(TokenType.OR):
-            op_token = self.advance()
-            right = self.parse_logical_and()
-            left = BinaryOp(op_token.line, op_token.column, left, 'or', right)
-        
-        return left
-    
-    def parse_logical_and(self) -> ASTNode:
-        """Parse logical AND expression"""
-        left = self.parse_equality()
-        
-        while self.match(TokenType.AND):
-            op_token = self.advance()
-            right = self.parse_equality()
-            left = BinaryOp(op_token.line, op_token.column, left, 'and', right)
-        
-        return left
-    
-    def parse_equality(self) -> ASTNode:
-        """Parse equality expression (==, !=)"""
-        left = self.parse_relational()
-        
-        while self.match(TokenType.EQ, TokenType.NE):
-            op_token = self.advance()
-            op = '==' if op_token.type == TokenType.EQ else '!='
-            right = self.parse_relational()
-            left = BinaryOp(op_token.line, op_token.column, left, op, right)
-        
-        return left
+        return self.parse_binary(1)
     
-    def parse_relational(self) -> ASTNode:
-        """Parse relational expression (<, >, <=, >=)"""
-        left = self.parse_additive()
-        
-        while self.match(TokenType.LT, TokenType.GT, TokenType.LE, TokenType.GE):
-            op_token = self.advance()
-            op_map = {
-                TokenType.LT: '<',
-                TokenType.GT: '>',
-                TokenType.LE: '<=',
-                TokenType.GE: '>='
-            }
-            op = op_map[op_token.type]
-            right = self.parse_additive()
-            left = BinaryOp(op_token.line, op_token.column, left, op, right)
-        
-        return left
-    
-    def parse_additive(self) -> ASTNode:
-        """Parse additive expression (+, -)"""
-        left = self.parse_multiplicative()
-        
-        while self.match(TokenType.PLUS, TokenType.MINUS):
-            op_token = self.advance()
-            op = '+' if op_token.type == TokenType.PLUS else '-'
-            right = self.parse_multiplicative()
-            left = BinaryOp(op_token.line, op_token.column, left, op, right)
-        
-        return left
-    
-    def parse_multiplicative(self) -> ASTNode:
-        """Parse multiplicative expression (*, /, %)"""
+    def parse_binary(self, min_precedence: int) -> ASTNode:
+        """Parse binary operators of at least min_precedence (or, and,
+        equality, relational, additive and multiplicative levels)"""
+        # Precedence climbing: one loop covers every level, instead of a
+        # method call per level for each operand
         left = self.parse_power()
         
-        while self.match(TokenType.MULTIPLY, TokenType.DIVIDE, TokenType.MODULO):
+        while True:
+            entry = BINARY_OPS.get(self.current_token.type)
+            if entry is None or entry[1] < min_precedence:
+                return left
+            op, precedence = entry
             op_token = self.advance()
-            op_map = {
-                TokenType.MULTIPLY: '*',
-                TokenType.DIVIDE: '/',
-                TokenType.MODULO: '%'
-            }
-            op = op_map[op_token.type]
-            right = self.parse_power()
+            right = self.parse_binary(precedence + 1)
             left = BinaryOp(op_token.line, op_token.column, left, op, right)
-        
-        return left
     
     def parse_power(self) -> ASTNode:
         """Parse power expression (**)"""
         left = self.parse_unary()
-        
-        if self.match(TokenType.POWER):
-            op_token = self.advance()
-            right = self.parse_power()  # Right associative
-            left = BinaryOp(op_token.line, op_token.column, left, '**', right)
-        
-        return left
+        if self.current_token.type != TokenType.POWER:
+            return left
+        
+        # Collect the whole chain, then fold it from the right since ** is
+        # right associative
+        operands = [left]
+        op_tokens = []
+        while self.current_token.type == TokenType.POWER:
+            op_tokens.append(self.advance())
+            operands.append(self.parse_unary())
+        
+        right = operands.pop()
+        while op_tokens:
+            op_token = op_tokens.pop()
+            right = BinaryOp(op_token.line, op_token.column, operands.pop(), '**', right)
+        return right
     
     def parse_unary(self) -> ASTNode:
         """Parse unary expression (-, not)"""
-        if self.match(TokenType.MINUS, TokenType.NOT):
+        if self.current_token.type in UNARY_OPS:
             op_token = self.advance()
-            op = '-' if op_token.type == TokenType.MINUS else 'not'
+            op = UNARY_OPS[op_token.type]
             operand = self.parse_unary()
             return UnaryOp(op_token.line, op_token.column, op, operand)
         
@@ -567,61 +613,42 @@ class Parser:
         token = self.current_token
         
         # Literals
-        if self.match(TokenType.INT_LITERAL):
+        token_type = token.type
+        literal_type = LITERAL_TYPES.get(token_type)
+        if literal_type is not None:
             self.advance()
-            return Literal(token.line, token.column, token.value, 'int')
-        
-        elif self.match(TokenType.FLOAT_LITERAL):
-            self.advance()
-            return Literal(token.line, token.column, token.value, 'float')
-        
-        elif self.match(TokenType.STRING_LITERAL):
-            self.advance()
-            return Literal(token.line, token.column, token.value, 'string')
-        
-        elif self.match(TokenType.BOOL_LITERAL):
-            self.advance()
-            return Literal(token.line, token.column, token.value, 'bool')
+            return Literal(token.line, token.column, token.value, literal_type)
         
         # Array literal [1, 2, 3]
-        elif self.match(TokenType.LBRACKET):
+        elif token_type == TokenType.LBRACKET:
             return self.parse_array_literal()
         
         # Built-in functions or identifiers
-        elif self.match(TokenType.LEN, TokenType.RANDOM, TokenType.SUBSTR, TokenType.CONCAT, TokenType.INPUT):
-            func_name = token.value
+        elif token_type in BUILTIN_TYPES:
+            func_name = token.value  # Keywords match exactly, so already lower case
             self.advance()
             self.expect(TokenType.LPAREN)
-            arguments = []
-            if not self.match(TokenType.RPAREN):
-                arguments.append(self.parse_expression())
-                while self.match(TokenType.COMMA):
-                    self.advance()
-                    arguments.append(self.parse_expression())
+            arguments = self.parse_expression_list(TokenType.RPAREN)
             self.expect(TokenType.RPAREN)
             return BuiltInCall(token.line, token.column, func_name, arguments)
         
         # Identifier or function call
-        elif self.match(TokenType.IDENTIFIER):
+        elif token_type == TokenType.IDENTIFIER:
             name = token.value
             self.advance()
+            next_type = self.current_token.type
             
             # Array access arr[index]
-            if self.match(TokenType.LBRACKET):
+            if next_type == TokenType.LBRACKET:
                 self.advance()
                 index = self.parse_expression()
                 self.expect(TokenType.RBRACKET)
                 return ArrayAccess(token.line, token.column, Identifier(token.line, token.column, name), index)
             
             # Function call
-            elif self.match(TokenType.LPAREN):
+            elif next_type == TokenType.LPAREN:
                 self.advance()
-                arguments = []
-                if not self.match(TokenType.RPAREN):
-                    arguments.append(self.parse_expression())
-                    while self.match(TokenType.COMMA):
-                        self.advance()
-                        arguments.append(self.parse_expression())
+                arguments = self.parse_expression_list(TokenType.RPAREN)
                 self.expect(TokenType.RPAREN)
                 return FunctionCall(token.line, token.column, name, arguments)
             
@@ -630,26 +657,30 @@ class Parser:
                 return Identifier(token.line, token.column, name)
         
         # Parenthesized expression
-        elif self.match(TokenType.LPAREN):
+        elif token_type == TokenType.LPAREN:
             self.advance()
             expr = self.parse_expression()
             self.expect(TokenType.RPAREN)
             return expr
         
         else:
-            self.error(f"Unexpected token in expression: {token.type.name}")
+            self.error(f"Unexpected token in expression: {token_type.name}")
+    
+    def parse_expression_list(self, end_type: TokenType) -> List[ASTNode]:
+        """Parse comma separated expressions up to (not including) end_type"""
+        expressions = []
+        if self.current_token.type != end_type:
+            while True:
+                expressions.append(self.parse_expression())
+                if self.current_token.type != TokenType.COMMA:
+                    break
+                self.advance()
+        return expressions
     
     def parse_array_literal(self) -> ArrayLiteral:
         """Parse array literal [1, 2, 3]"""
         bracket_token = self.expect(TokenType.LBRACKET)
-        elements = []
-        
-        if not self.match(TokenType.RBRACKET):
-            elements.append(self.parse_expression())
-            while self.match(TokenType.COMMA):
-                self.advance()
-                elements.append(self.parse_expression())
-        
+        elements = self.parse_expression_list(TokenType.RBRACKET)
         self.expect(TokenType.RBRACKET)
         return ArrayLiteral(bracket_token.line, bracket_token.column, elements)
 
@@ -8,34 +8,72 @@ Phase 3: Performs semantic analysis including:
 """
 
 from parser import *
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, List, Optional, Tuple, Any
+
+
+# Binary operators grouped by the operand types they accept
+ARITHMETIC_OPS = frozenset(['+', '-', '*', '/', '%', '**'])
+RELATIONAL_OPS = frozenset(['<', '>', '<=', '>='])
+EQUALITY_OPS = frozenset(['==', '!='])
+LOGICAL_OPS = frozenset(['and', 'or'])
+
+NUMERIC_TYPES = frozenset(['int', 'float'])
+
+# Array type name -> element type name, the inverse of the parser's
+# ARRAY_TYPE_NAMES, so derived types reuse the declared type strings.
+# Its keys are every array type a program can have
+ELEMENT_TYPE_NAMES = {array: element for element, array in ARRAY_TYPE_NAMES.items()}
+
+class Symbol:
+    """A declared variable or function"""
+    
+    __slots__ = ('symbol_type', 'data_type', 'parameters', 'param_types', 'initialized')
+    
+    def __init__(self, symbol_type: str, data_type: str, parameters: Optional[List[tuple]] = None,
+                 initialized: bool = False):
+        self.symbol_type = symbol_type  # 'variable' or 'function'
+        self.data_type = data_type
+        self.parameters = parameters  # Functions only
+        # Just the parameter types, which is all a call needs
+        self.param_types = tuple(param_type for param_type, _ in parameters) if parameters is not None else None
+        self.initialized = initialized  # Variables only
+    
+    def __repr__(self):
+        if self.symbol_type == 'function':
+            extra = f"'parameters': {self.parameters!r}"
+        else:
+            extra = f"'initialized': {self.initialized!r}"
+        return f"{{'type': {self.symbol_type!r}, 'data_type': {self.data_type!r}, {extra}}}"
 
 
 class SymbolTable:
     """Symbol table for managing variable and function declarations"""
     
+    __slots__ = ('symbols', 'parent', 'children', 'scope_level')
+    
     def __init__(self, parent=None):
-        self.symbols: Dict[str, Dict] = {}
+        self.symbols: Dict[str, Symbol] = {}
         self.parent = parent
+        self.children: List['SymbolTable'] = []  # Nested scopes, in order of entry
         self.scope_level = 0 if parent is None else parent.scope_level + 1
+        if parent is not None:
+            parent.children.append(self)
     
     def define(self, name: str, symbol_type: str, data_type: str, **kwargs):
         """Define a new symbol in current scope"""
         if name in self.symbols:
             raise SemanticError(f"Redeclaration of '{name}' in the same scope")
         
-        self.symbols[name] = {
-            'type': symbol_type,  # 'variable' or 'function'
-            'data_type': data_type,
-            **kwargs
-        }
+        self.symbols[name] = Symbol(symbol_type, data_type, **kwargs)
     
-    def lookup(self, name: str) -> Optional[Dict]:
+    def lookup(self, name: str) -> Optional[Symbol]:
         """Look up a symbol in current scope or parent scopes"""
-        if name in self.symbols:
-            return self.symbols[name]
-        elif self.parent:
-            return self.parent.lookup(name)
+        scope = self
+        while scope is not None:
+            symbol = scope.symbols.get(name)
+            if symbol is not None:
+                return symbol
+            scope = scope.parent
         return None
     
     def exists(self, name: str) -> bool:
@@ -54,11 +92,47 @@ class SemanticError(Exception):
 class SemanticAnalyzer:
     """Performs semantic analysis on the AST"""
     
+    __slots__ = ('global_scope', 'current_scope', 'current_function', 'always_returns', 'errors',
+                 '_dispatch', '_builtins')
+    
     def __init__(self):
         self.global_scope = SymbolTable()
         self.current_scope = self.global_scope
         self.current_function = None
+        self.always_returns = False  # Every path through the statements analyzed so far returns
         self.errors: List[str] = []
+        
+        # Node class -> analysis method, so dispatch is one dict lookup
+        self._dispatch: Dict[type, Callable[[ASTNode], str]] = {
+            Program: self.analyze_Program,
+            VarDeclaration: self.analyze_VarDeclaration,
+            Assignment: self.analyze_Assignment,
+            BinaryOp: self.analyze_BinaryOp,
+            UnaryOp: self.analyze_UnaryOp,
+            Literal: self.analyze_Literal,
+            Identifier: self.analyze_Identifier,
+            IfStatement: self.analyze_IfStatement,
+            WhileStatement: self.analyze_WhileStatement,
+            ForStatement: self.analyze_ForStatement,
+            FunctionDef: self.analyze_FunctionDef,
+            FunctionCall: self.analyze_FunctionCall,
+            ReturnStatement: self.analyze_ReturnStatement,
+            PrintStatement: self.analyze_PrintStatement,
+            Block: self.analyze_Block,
+            ArrayLiteral: self.analyze_ArrayLiteral,
+            ArrayAccess: self.analyze_ArrayAccess,
+            ArrayAssignment: self.analyze_ArrayAssignment,
+            BuiltInCall: self.analyze_BuiltInCall,
+        }
+        
+        # Built-in function -> (argument count, method checking the arguments)
+        self._builtins: Dict[str, Tuple[int, Callable[[BuiltInCall, List[ASTNode]], str]]] = {
+            'len': (1, self.check_len),
+            'random': (2, self.check_random),
+            'substr': (3, self.check_substr),
+            'concat': (2, self.check_concat),
+            'input': (1, self.check_input),
+        }
     
     def error(self, message: str, node: ASTNode):
         """Record a semantic error"""
@@ -80,20 +154,18 @@ class SemanticAnalyzer:
         Analyze a node and return its type
         Dispatches to specific analysis methods based on node type
         """
-        method_name = f'analyze_{node.__class__.__name__}'
-        method = getattr(self, method_name, None)
-        
-        if method:
-            return method(node)
-        else:
+        method = self._dispatch.get(type(node))
+        if method is None:
             raise SemanticError(f"No analysis method for {node.__class__.__name__}")
+        return method(node)
     
     # ============= Analysis Methods =============
     
     def analyze_Program(self, node: Program) -> str:
         """Analyze the entire program"""
+        analyze = self.analyze
         for statement in node.statements:
-            self.analyze(statement)
+            analyze(statement)
         return 'void'
     
     def analyze_VarDeclaration(self, node: VarDeclaration) -> str:
@@ -129,12 +201,12 @@ class SemanticAnalyzer:
         if not symbol:
             self.error(f"Undefined variable '{node.name}'", node)
         
-        if symbol['type'] != 'variable':
+        if symbol.symbol_type != 'variable':
             self.error(f"'{node.name}' is not a variable", node)
         
         # Type check value
         value_type = self.analyze(node.value)
-        var_type = symbol['data_type']
+        var_type = symbol.data_type
         
         if not self.is_compatible_type(var_type, value_type):
             self.error(
@@ -149,10 +221,11 @@ class SemanticAnalyzer:
         """Analyze binary operation"""
         left_type = self.analyze(node.left)
         right_type = self.analyze(node.right)
+        operator = node.operator
         
         # Arithmetic operators
-        if node.operator in ['+', '-', '*', '/', '%', '**']:
-            if not self.is_numeric(left_type) or not self.is_numeric(right_type):
+        if operator in ARITHMETIC_OPS:
+            if left_type not in NUMERIC_TYPES or right_type not in NUMERIC_TYPES:
                 self.error(
                     f"Operator '{node.operator}' requires numeric operands, "
                     f"got {left_type} and {right_type}",
@@ -164,8 +237,8 @@ class SemanticAnalyzer:
             return 'int'
         
         # Relational operators
-        elif node.operator in ['<', '>', '<=', '>=']:
-            if not self.is_numeric(left_type) or not self.is_numeric(right_type):
+        elif operator in RELATIONAL_OPS:
+            if left_type not in NUMERIC_TYPES or right_type not in NUMERIC_TYPES:
                 self.error(
                     f"Operator '{node.operator}' requires numeric operands, "
                     f"got {left_type} and {right_type}",
@@ -174,8 +247,9 @@ class SemanticAnalyzer:
             return 'bool'
         
         # Equality operators
-        elif node.operator in ['==', '!=']:
-            if not self.is_compatible_type(left_type, right_type):
+        elif operator in EQUALITY_OPS:
+            # is_compatible_type(left_type, right_type), inlined
+            if left_type != right_type and not (left_type == 'float' and right_type == 'int'):
                 self.error(
                     f"Cannot compare {left_type} with {right_type}",
                     node
@@ -183,7 +257,7 @@ class SemanticAnalyzer:
             return 'bool'
         
         # Logical operators
-        elif node.operator in ['and', 'or']:
+        elif operator in LOGICAL_OPS:
             if left_type != 'bool' or right_type != 'bool':
                 self.error(
                     f"Logical operator '{node.operator}' requires boolean operands, "
@@ -200,7 +274,7 @@ class SemanticAnalyzer:
         operand_type = self.analyze(node.operand)
         
         if node.operator == '-':
-            if not self.is_numeric(operand_type):
+            if operand_type not in NUMERIC_TYPES:
                 self.error(f"Unary '-' requires numeric operand, got {operand_type}", node)
             return operand_type
         
@@ -222,45 +296,59 @@ class SemanticAnalyzer:
         if not symbol:
             self.error(f"Undefined variable '{node.name}'", node)
         
-        if symbol['type'] != 'variable':
+        if symbol.symbol_type != 'variable':
             self.error(f"'{node.name}' is not a variable", node)
         
-        return symbol['data_type']
+        return symbol.data_type
     
     def analyze_IfStatement(self, node: IfStatement) -> str:
         """Analyze if statement"""
+        analyze = self.analyze
+        
         # Check condition type
-        cond_type = self.analyze(node.condition)
+        cond_type = analyze(node.condition)
         if cond_type != 'bool':
             self.error(f"If condition must be boolean, got {cond_type}", node)
         
         # Analyze then block
+        returned_before = self.always_returns
+        self.always_returns = False
         self.enter_scope()
         for stmt in node.then_block:
-            self.analyze(stmt)
+            analyze(stmt)
         self.exit_scope()
+        then_returns = self.always_returns
         
         # Analyze else block if present
+        else_returns = False
         if node.else_block:
+            self.always_returns = False
             self.enter_scope()
             for stmt in node.else_block:
-                self.analyze(stmt)
+                analyze(stmt)
             self.exit_scope()
+            else_returns = self.always_returns
         
+        # Returns on every path only if both branches do
+        self.always_returns = returned_before or (then_returns and else_returns)
         return 'void'
     
     def analyze_WhileStatement(self, node: WhileStatement) -> str:
         """Analyze while loop"""
+        analyze = self.analyze
+        
         # Check condition type
-        cond_type = self.analyze(node.condition)
+        cond_type = analyze(node.condition)
         if cond_type != 'bool':
             self.error(f"While condition must be boolean, got {cond_type}", node)
         
-        # Analyze body
+        # Analyze body - it may run zero times, so its returns don't count
+        returned_before = self.always_returns
         self.enter_scope()
         for stmt in node.body:
-            self.analyze(stmt)
+            analyze(stmt)
         self.exit_scope()
+        self.always_returns = returned_before
         
         return 'void'
     
@@ -279,31 +367,36 @@ class SemanticAnalyzer:
         # Analyze update
         self.analyze(node.update)
         
-        # Analyze body
+        # Analyze body - it may run zero times, so its returns don't count
+        returned_before = self.always_returns
+        analyze = self.analyze
         for stmt in node.body:
-            self.analyze(stmt)
+            analyze(stmt)
+        self.always_returns = returned_before
         
         self.exit_scope()
         return 'void'
     
     def analyze_FunctionDef(self, node: FunctionDef) -> str:
         """Analyze function definition"""
-        # Check if function already exists
-        if node.name in self.current_scope.symbols:
+        # Add function to symbol table - define() rejects a name already
+        # declared in this scope
+        try:
+            self.current_scope.define(
+                node.name,
+                symbol_type='function',
+                data_type=node.return_type,
+                parameters=node.parameters
+            )
+        except SemanticError:
             self.error(f"Function '{node.name}' already declared", node)
         
-        # Add function to symbol table
-        self.current_scope.define(
-            node.name,
-            symbol_type='function',
-            data_type=node.return_type,
-            parameters=node.parameters
-        )
-        
         # Enter function scope
         self.enter_scope()
         old_function = self.current_function
+        old_returns = self.always_returns
         self.current_function = node
+        self.always_returns = False
         
         # Add parameters to function scope
         for param_type, param_name in node.parameters:
@@ -315,18 +408,18 @@ class SemanticAnalyzer:
             )
         
         # Analyze function body
-        has_return = False
+        analyze = self.analyze
         for stmt in node.body:
-            self.analyze(stmt)
-            if isinstance(stmt, ReturnStatement):
-                has_return = True
+            analyze(stmt)
         
-        # Check if non-void function has return statement
-        if node.return_type != 'void' and not has_return:
+        # A non-void function must return on every path - control reaching
+        # the end of the function would run on into the code after it
+        if node.return_type != 'void' and not self.always_returns:
             self.error(f"Function '{node.name}' must return a value of type {node.return_type}", node)
         
         # Exit function scope
         self.current_function = old_function
+        self.always_returns = old_returns
         self.exit_scope()
         
         return 'void'
@@ -338,21 +431,22 @@ class SemanticAnalyzer:
         if not symbol:
             self.error(f"Undefined function '{node.name}'", node)
         
-        if symbol['type'] != 'function':
+        if symbol.symbol_type != 'function':
             self.error(f"'{node.name}' is not a function", node)
         
         # Check argument count
-        expected_params = symbol['parameters']
-        if len(node.arguments) != len(expected_params):
+        param_types = symbol.param_types
+        if len(node.arguments) != len(param_types):
             self.error(
-                f"Function '{node.name}' expects {len(expected_params)} arguments, "
+                f"Function '{node.name}' expects {len(param_types)} arguments, "
                 f"got {len(node.arguments)}",
                 node
             )
         
         # Type check arguments
-        for i, (arg, (param_type, param_name)) in enumerate(zip(node.arguments, expected_params)):
-            arg_type = self.analyze(arg)
+        analyze = self.analyze
+        for i, (arg, param_type) in enumerate(zip(node.arguments, param_types)):
+            arg_type = analyze(arg)
             if not self.is_compatible_type(param_type, arg_type):
                 self.error(
                     f"Argument {i+1} of function '{node.name}' expects {param_type}, "
@@ -360,7 +454,7 @@ class SemanticAnalyzer:
                     node
                 )
         
-        return symbol['data_type']
+        return symbol.data_type
     
     def analyze_ReturnStatement(self, node: ReturnStatement) -> str:
         """Analyze return statement"""
@@ -380,18 +474,21 @@ class SemanticAnalyzer:
             if expected_type != 'void':
                 self.error(f"Function must return a value of type {expected_type}", node)
         
+        self.always_returns = True
         return 'void'
     
     def analyze_PrintStatement(self, node: PrintStatement) -> str:
         """Analyze print statement"""
+        analyze = self.analyze
         for expr in node.expressions:
-            self.analyze(expr)
+            analyze(expr)
         return 'void'
     
     def analyze_Block(self, node: Block) -> str:
         """Analyze a block of statements"""
+        analyze = self.analyze
         for stmt in node.statements:
-            self.analyze(stmt)
+            analyze(stmt)
         return 'void'
     
     def analyze_ArrayLiteral(self, node: ArrayLiteral) -> str:
@@ -400,22 +497,26 @@ class SemanticAnalyzer:
             return 'int[]'  # Empty array defaults to int[]
         
         # All elements should have the same type
-        first_type = self.analyze(node.elements[0])
-        for elem in node.elements[1:]:
-            elem_type = self.analyze(elem)
-            if not self.is_compatible_type(first_type, elem_type):
+        analyze = self.analyze
+        elements = iter(node.elements)
+        first_type = analyze(next(elements))
+        for elem in elements:
+            elem_type = analyze(elem)
+            # Same type is the common case - only check coercion otherwise
+            if elem_type != first_type and not self.is_compatible_type(first_type, elem_type):
                 self.error(f"Array elements must have consistent types, got {first_type} and {elem_type}", node)
         
         # Remove '[]' suffix if present, then add it back
         base_type = first_type.replace('[]', '')
-        return base_type + '[]'
+        return ARRAY_TYPE_NAMES.get(base_type) or base_type + '[]'
     
     def analyze_ArrayAccess(self, node: ArrayAccess) -> str:
         """Analyze array element access arr[index]"""
         # Get array type
         array_type = self.analyze(node.array)
         
-        if not array_type.endswith('[]'):
+        element_type = ELEMENT_TYPE_NAMES.get(array_type)
+        if element_type is None:
             self.error(f"Cannot index non-array type '{array_type}'", node)
         
         # Check index type
@@ -423,8 +524,7 @@ class SemanticAnalyzer:
         if index_type != 'int':
             self.error(f"Array index must be int, got {index_type}", node)
         
-        # Return element type (remove [] suffix)
-        return array_type[:-2]
+        return element_type
     
     def analyze_ArrayAssignment(self, node: ArrayAssignment) -> str:
         """Analyze array element assignment arr[index] = value"""
@@ -433,8 +533,9 @@ class SemanticAnalyzer:
         if not symbol:
             self.error(f"Undefined array '{node.array}'", node)
         
-        array_type = symbol['data_type']
-        if not array_type.endswith('[]'):
+        array_type = symbol.data_type
+        element_type = ELEMENT_TYPE_NAMES.get(array_type)
+        if element_type is None:
             self.error(f"'{node.array}' is not an array", node)
         
         # Check index type
@@ -444,7 +545,6 @@ class SemanticAnalyzer:
         
         # Check value type
         value_type = self.analyze(node.value)
-        element_type = array_type[:-2]
         
         if not self.is_compatible_type(element_type, value_type):
             self.error(
@@ -456,68 +556,64 @@ class SemanticAnalyzer:
     
     def analyze_BuiltInCall(self, node: BuiltInCall) -> str:
         """Analyze built-in function call"""
-        func = node.function.lower()
+        func = node.function
         args = node.arguments
         
-        # len(array) or len(string) -> int
-        if func == 'len':
-            if len(args) != 1:
-                self.error(f"len() expects 1 argument, got {len(args)}", node)
-            arg_type = self.analyze(args[0])
-            if not (arg_type.endswith('[]') or arg_type == 'string'):
-                self.error(f"len() requires array or string, got {arg_type}", node)
-            return 'int'
-        
-        # random(min, max) -> int
-        elif func == 'random':
-            if len(args) != 2:
-                self.error(f"random() expects 2 arguments, got {len(args)}", node)
-            min_type = self.analyze(args[0])
-            max_type = self.analyze(args[1])
-            if not self.is_numeric(min_type) or not self.is_numeric(max_type):
-                self.error(f"random() requires numeric arguments, got {min_type} and {max_type}", node)
-            return 'int'
-        
-        # substr(string, start, end) -> string
-        elif func == 'substr':
-            if len(args) != 3:
-                self.error(f"substr() expects 3 arguments, got {len(args)}", node)
-            str_type = self.analyze(args[0])
-            start_type = self.analyze(args[1])
-            end_type = self.analyze(args[2])
-            if str_type != 'string':
-                self.error(f"substr() first argument must be string, got {str_type}", node)
-            if start_type != 'int' or end_type != 'int':
-                self.error(f"substr() indices must be int, got {start_type} and {end_type}", node)
-            return 'string'
-        
-        # concat(string, string) -> string
-        elif func == 'concat':
-            if len(args) != 2:
-                self.error(f"concat() expects 2 arguments, got {len(args)}", node)
-            arg1_type = self.analyze(args[0])
-            arg2_type = self.analyze(args[1])
-            if arg1_type != 'string' or arg2_type != 'string':
-                self.error(f"concat() requires string arguments, got {arg1_type} and {arg2_type}", node)
-            return 'string'
-        
-        # input(prompt) -> string
-        elif func == 'input':
-            if len(args) != 1:
-                self.error(f"input() expects 1 argument, got {len(args)}", node)
-            prompt_type = self.analyze(args[0])
-            if prompt_type != 'string':
-                self.error(f"input() prompt must be string, got {prompt_type}", node)
-            return 'string'
-        
-        else:
+        builtin = self._builtins.get(func)
+        if builtin is None:
             self.error(f"Unknown built-in function: {func}", node)
+        arity, check = builtin
+        if len(args) != arity:
+            plural = 's' if arity != 1 else ''
+            self.error(f"{func}() expects {arity} argument{plural}, got {len(args)}", node)
+        return check(node, args)
+    
+    def check_len(self, node: BuiltInCall, args: List[ASTNode]) -> str:
+        """len(array) or len(string) -> int"""
+        arg_type = self.analyze(args[0])
+        if arg_type not in ELEMENT_TYPE_NAMES and arg_type != 'string':
+            self.error(f"len() requires array or string, got {arg_type}", node)
+        return 'int'
+    
+    def check_random(self, node: BuiltInCall, args: List[ASTNode]) -> str:
+        """random(min, max) -> int"""
+        min_type = self.analyze(args[0])
+        max_type = self.analyze(args[1])
+        if min_type not in NUMERIC_TYPES or max_type not in NUMERIC_TYPES:
+            self.error(f"random() requires numeric arguments, got {min_type} and {max_type}", node)
+        return 'int'
+    
+    def check_substr(self, node: BuiltInCall, args: List[ASTNode]) -> str:
+        """substr(string, start, end) -> string"""
+        str_type = self.analyze(args[0])
+        start_type = self.analyze(args[1])
+        end_type = self.analyze(args[2])
+        if str_type != 'string':
+            self.error(f"substr() first argument must be string, got {str_type}", node)
+        if start_type != 'int' or end_type != 'int':
+            self.error(f"substr() indices must be int, got {start_type} and {end_type}", node)
+        return 'string'
+    
+    def check_concat(self, node: BuiltInCall, args: List[ASTNode]) -> str:
+        """concat(string, string) -> string"""
+        arg1_type = self.analyze(args[0])
+        arg2_type = self.analyze(args[1])
+        if arg1_type != 'string' or arg2_type != 'string':
+            self.error(f"concat() requires string arguments, got {arg1_type} and {arg2_type}", node)
+        return 'string'
+    
+    def check_input(self, node: BuiltInCall, args: List[ASTNode]) -> str:
+        """input(prompt) -> string"""
+        prompt_type = self.analyze(args[0])
+        if prompt_type != 'string':
+            self.error(f"input() prompt must be string, got {prompt_type}", node)
+        return 'string'
     
     # ============= Helper Methods =============
     
     def is_numeric(self, type_name: str) -> bool:
         """Check if type is numeric"""
-        return type_name in ['int', 'float']
+        return type_name in NUMERIC_TYPES
     
     def is_compatible_type(self, expected: str, actual: str) -> bool:
         """Check if actual type is compatible with expected type"""
@@ -532,13 +628,16 @@ class SemanticAnalyzer:
         """Get string representation of symbol table for debugging"""
         result = []
         
-        def traverse(scope, indent=0):
-            prefix = "  " * indent
+        # Depth-first, so each scope is listed right after its parent
+        stack = [self.global_scope]
+        while stack:
+            scope = stack.pop()
+            prefix = "  " * scope.scope_level
             result.append(f"{prefix}Scope Level {scope.scope_level}:")
             for name, info in scope.symbols.items():
                 result.append(f"{prefix}  {name}: {info}")
+            stack.extend(reversed(scope.children))
         
-        traverse(self.global_scope)
         return "\n".join(result)
 
 